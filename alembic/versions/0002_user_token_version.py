@@ -0,0 +1,27 @@
+"""users.token_version for JWT revocation
+
+Revision ID: 0002_user_token_version
+Revises: 0001_baseline
+Create Date: 2026-10-17 10:05:00
+
+Колонка появилась в модели раньше миграций: база, созданная тогда через
+create_all, её уже содержит, а существовавшая до того - нет. Поэтому
+ADD COLUMN IF NOT EXISTS: после alembic stamp 0001_baseline upgrade проходит
+в обоих случаях.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_user_token_version'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,57 @@
+"""hot-path indexes and uniqueness constraints
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_user_token_version
+Create Date: 2026-10-17 10:10:00
+
+Если в submissions есть повторные сдачи одного задания одним студентом,
+уникальный индекс не создастся - дубликаты нужно разобрать вручную.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_hot_path_indexes'
+down_revision = '0002_user_token_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # course_students: убираем мусорные и повторные записи, затем составной PK
+    op.execute("DELETE FROM course_students WHERE course_id IS NULL OR student_id IS NULL")
+    op.execute("""
+        DELETE FROM course_students a
+        USING course_students b
+        WHERE a.course_id = b.course_id
+          AND a.student_id = b.student_id
+          AND a.ctid > b.ctid
+    """)
+    op.alter_column('course_students', 'course_id', nullable=False)
+    op.alter_column('course_students', 'student_id', nullable=False)
+    op.create_primary_key('pk_course_students', 'course_students', ['course_id', 'student_id'])
+    op.create_index('ix_course_students_student_id', 'course_students', ['student_id'])
+
+    op.create_index(
+        'uq_submissions_assignment_student', 'submissions',
+        ['assignment_id', 'student_id'], unique=True
+    )
+    op.create_index('ix_submissions_student_id', 'submissions', ['student_id'])
+
+    op.create_index('ix_courses_teacher_id', 'courses', ['teacher_id'])
+    op.create_index('ix_assignments_course_id', 'assignments', ['course_id'])
+    op.create_index('ix_materials_course_order', 'materials', ['course_id', 'order_number'])
+    op.create_index('ix_mock_statistics_course_id', 'mock_statistics', ['course_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mock_statistics_course_id', table_name='mock_statistics')
+    op.drop_index('ix_materials_course_order', table_name='materials')
+    op.drop_index('ix_assignments_course_id', table_name='assignments')
+    op.drop_index('ix_courses_teacher_id', table_name='courses')
+    op.drop_index('ix_submissions_student_id', table_name='submissions')
+    op.drop_index('uq_submissions_assignment_student', table_name='submissions')
+    op.drop_index('ix_course_students_student_id', table_name='course_students')
+    op.drop_constraint('pk_course_students', 'course_students', type_='primary')
+    op.alter_column('course_students', 'student_id', nullable=True)
+    op.alter_column('course_students', 'course_id', nullable=True)
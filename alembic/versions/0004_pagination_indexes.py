@@ -0,0 +1,22 @@
+"""keyset pagination indexes
+
+Revision ID: 0004_pagination_indexes
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-17 10:20:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_pagination_indexes'
+down_revision = '0003_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
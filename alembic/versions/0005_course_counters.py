@@ -0,0 +1,66 @@
+"""course_counters table
+
+Revision ID: 0005_course_counters
+Revises: 0004_pagination_indexes
+Create Date: 2026-10-17 10:30:00
+
+Таблица заполняется пересчётом из исходных таблиц; дальше её ведут
+пути записи, дрейф исправляет python -m app.utils.reconcile_counters
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_course_counters'
+down_revision = '0004_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_counters',
+        sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('students', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('assignments', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('materials', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('submissions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('pending', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('graded', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('course_id')
+    )
+    op.create_index('ix_course_counters_students', 'course_counters', ['students'])
+
+    op.execute("""
+        INSERT INTO course_counters (course_id, students, assignments, materials, submissions, pending, graded, score_sum, updated_at)
+        SELECT c.id,
+               coalesce(s.n, 0), coalesce(a.n, 0), coalesce(m.n, 0),
+               coalesce(sub.n, 0), coalesce(sub.pending, 0), coalesce(g.n, 0), coalesce(g.total, 0),
+               now() AT TIME ZONE 'utc'
+        FROM courses c
+        LEFT JOIN (SELECT course_id, count(*) AS n FROM course_students GROUP BY course_id) s ON s.course_id = c.id
+        LEFT JOIN (SELECT course_id, count(*) AS n FROM assignments GROUP BY course_id) a ON a.course_id = c.id
+        LEFT JOIN (SELECT course_id, count(*) AS n FROM materials GROUP BY course_id) m ON m.course_id = c.id
+        LEFT JOIN (
+            SELECT a.course_id, count(*) AS n, count(*) FILTER (WHERE s.status = 'pending') AS pending
+            FROM submissions s JOIN assignments a ON a.id = s.assignment_id
+            GROUP BY a.course_id
+        ) sub ON sub.course_id = c.id
+        LEFT JOIN (
+            SELECT a.course_id, count(*) AS n, sum(g.score) AS total
+            FROM grades g
+            JOIN submissions s ON s.id = g.submission_id
+            JOIN assignments a ON a.id = s.assignment_id
+            GROUP BY a.course_id
+        ) g ON g.course_id = c.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_counters_students', table_name='course_counters')
+    op.drop_table('course_counters')
@@ -0,0 +1,30 @@
+"""submission listing indexes
+
+Revision ID: 0006_submission_list_indexes
+Revises: 0005_course_counters
+Create Date: 2026-10-17 10:40:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_submission_list_indexes'
+down_revision = '0005_course_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_submissions_assignment_submitted', 'submissions',
+        ['assignment_id', 'submitted_at', 'id']
+    )
+    op.create_index(
+        'ix_submissions_assignment_status', 'submissions',
+        ['assignment_id', 'status', 'submitted_at', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_assignment_status', table_name='submissions')
+    op.drop_index('ix_submissions_assignment_submitted', table_name='submissions')
@@ -0,0 +1,38 @@
+"""course_files table
+
+Revision ID: 0007_course_files
+Revises: 0006_submission_list_indexes
+Create Date: 2026-10-17 10:50:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_course_files'
+down_revision = '0006_submission_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'course_files',
+        sa.Column('course_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('uploaded_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('course_id', 'sha256', name='pk_course_files')
+    )
+    op.create_index('ix_course_files_sha256', 'course_files', ['sha256'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_course_files_sha256', table_name='course_files')
+    op.drop_table('course_files')
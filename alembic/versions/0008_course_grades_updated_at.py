@@ -0,0 +1,38 @@
+"""course_counters.grades_updated_at
+
+Revision ID: 0008_course_grades_updated_at
+Revises: 0007_course_files
+Create Date: 2026-10-17 11:10:00
+
+Версия журнала оценок курса (ETag GET /courses/{id}/gradebook); ведут пути
+записи оценок, заполняется из grades.updated_at
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_course_grades_updated_at'
+down_revision = '0007_course_files'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('course_counters', sa.Column('grades_updated_at', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE course_counters cc
+        SET grades_updated_at = g.last_updated
+        FROM (
+            SELECT a.course_id, max(g.updated_at) AS last_updated
+            FROM grades g
+            JOIN submissions s ON s.id = g.submission_id
+            JOIN assignments a ON a.id = s.assignment_id
+            GROUP BY a.course_id
+        ) g
+        WHERE g.course_id = cc.course_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('course_counters', 'grades_updated_at')
@@ -3,9 +3,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.user import User, UserRole
 from app.models.course import Course
+from app.models.course_counter import CourseCounter
 from app.models.assignment import Assignment
 from app.schemas.admin import AnalyticsOverview
 from app.utils.dependencies import check_permission
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/admin/analytics", tags=["admin-analytics"])
 @router.get("/overview", response_model=AnalyticsOverview)
 def get_analytics_overview(
     current_user: User = Depends(check_permission("can_view_analytics")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Общая статистика платформы"""
 
@@ -47,21 +48,20 @@ def get_analytics_overview(
 def get_top_courses(
     limit: int = 10,
     current_user: User = Depends(check_permission("can_view_analytics")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Топ курсов по количеству студентов"""
-    from app.models.course import course_students
-
+    # курс без строки счётчиков (новый или ещё не сверенный) - с нулём, а не пропадает
+    students_count = func.coalesce(CourseCounter.students, 0)
     courses_data = db.query(
         Course.id,
         Course.title,
         Course.is_published,
         User.full_name.label('teacher_name'),
-        func.count(course_students.c.student_id).label('students_count')
+        students_count.label('students_count')
     ).join(User, Course.teacher_id == User.id)\
-        .outerjoin(course_students, course_students.c.course_id == Course.id)\
-        .group_by(Course.id, Course.title, Course.is_published, User.full_name)\
-        .order_by(func.count(course_students.c.student_id).desc())\
+        .outerjoin(CourseCounter, CourseCounter.course_id == Course.id)\
+        .order_by(students_count.desc())\
         .limit(limit)\
         .all()
 
@@ -81,21 +81,33 @@ def get_top_courses(
 @router.get("/teachers-stats")
 def get_teachers_stats(
     current_user: User = Depends(check_permission("can_view_analytics")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Статистика преподавателей"""
     from app.models.course import course_students
 
+    # курсы и различные студенты считаются отдельными агрегатами по преподавателю,
+    # без перемножения строк курсов и записей
+    courses = (
+        db.query(Course.teacher_id, func.count(Course.id).label('n'))
+        .group_by(Course.teacher_id)
+        .subquery()
+    )
+    students = (
+        db.query(Course.teacher_id, func.count(func.distinct(course_students.c.student_id)).label('n'))
+        .join(course_students, course_students.c.course_id == Course.id)
+        .group_by(Course.teacher_id)
+        .subquery()
+    )
     teachers_data = db.query(
         User.id,
         User.full_name,
         User.email,
-        func.count(func.distinct(Course.id)).label('courses_count'),
-        func.count(func.distinct(course_students.c.student_id)).label('total_students')
+        func.coalesce(courses.c.n, 0).label('courses_count'),
+        func.coalesce(students.c.n, 0).label('total_students')
     ).filter(User.role == UserRole.teacher)\
-        .outerjoin(Course, Course.teacher_id == User.id)\
-        .outerjoin(course_students, course_students.c.course_id == Course.id)\
-        .group_by(User.id, User.full_name, User.email)\
+        .outerjoin(courses, courses.c.teacher_id == User.id)\
+        .outerjoin(students, students.c.teacher_id == User.id)\
         .all()
 
     result = []
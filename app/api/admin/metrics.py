@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+
+from app.database import pool_statuses
+from app.models.user import User
+from app.utils.db_metrics import pool_metrics
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.enrollment_index import enrollment_index
+from app.utils.dependencies import check_permission, get_auth_cache_stats
+
+router = APIRouter(prefix="/admin/metrics", tags=["admin-metrics"])
+
+
+@router.get("/auth-cache")
+def get_auth_cache_metrics(
+    current_user: User = Depends(check_permission("can_view_analytics"))
+):
+    """Статистика кэша токенов и пользователей"""
+    return get_auth_cache_stats()
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics(
+    current_user: User = Depends(check_permission("can_view_analytics"))
+):
+    """Состояние пула соединений, ожидание checkout и удержание по роутам"""
+    return {
+        "pools": pool_statuses(),
+        **pool_metrics.snapshot()
+    }
+
+
+@router.get("/enrollment-index")
+def get_enrollment_index_metrics(
+    current_user: User = Depends(check_permission("can_view_analytics"))
+):
+    """Состояние индекса записей на курсы"""
+    return {
+        **enrollment_index.stats(),
+        "memory_bytes": enrollment_index.memory_bytes()
+    }
+
+
+@router.get("/dashboard-cache")
+def get_dashboard_cache_metrics(
+    current_user: User = Depends(check_permission("can_view_analytics"))
+):
+    """Статистика кэша дашбордов студентов"""
+    return dashboard_cache.stats()
@@ -5,7 +5,7 @@ from uuid import UUID
 import random
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.models.course import Course
 from app.models.assignment import Assignment
@@ -113,7 +113,7 @@ def generate_mock_data(
 def get_mock_statistics(
     course_id: UUID = None,
     current_user: User = Depends(check_permission("can_view_analytics")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Получить все тестовые данные"""
     query = db.query(MockStatistic).filter(MockStatistic.is_mock == True)
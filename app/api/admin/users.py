@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_db, get_read_db, get_async_db
 from app.models.user import User
 from app.models.admin_permission import AdminPermission
+from app.models.course import course_students
+from app.models.assignment import Assignment
+from app.models.submission import Submission
 from app.schemas.admin import UserAdminResponse, UserUpdate, AdminPermissionUpdate, AdminPermissionResponse
-from app.utils.dependencies import get_current_admin, check_permission
-from app.utils.auth import get_password_hash
+from app.utils.dependencies import get_current_admin, check_permission, invalidate_user_cache, revoke_user_tokens
+from app.utils.course_counters import reconcile_counters
+from app.utils.enrollment_index import enrollment_index
+from app.utils.auth import get_password_hash_async
+from app.utils.pagination import PageParams, keyset, page_rows
 import secrets
 
 router = APIRouter(prefix="/admin/users", tags=["admin-users"])
@@ -16,16 +23,20 @@ router = APIRouter(prefix="/admin/users", tags=["admin-users"])
 
 @router.get("/", response_model=List[UserAdminResponse])
 def get_users(
+    response: Response,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     is_blocked: Optional[bool] = None,
     search: Optional[str] = None,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
+    page: PageParams = Depends(),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Устарело: используйте cursor"),
     current_user: User = Depends(check_permission("can_manage_users")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Получить список всех пользователей с фильтрами"""
+    if skip is not None and page.cursor:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip")
+
     query = db.query(User)
 
     # Фильтры
@@ -40,8 +51,13 @@ def get_users(
             (User.email.ilike(f"%{search}%")) | (User.full_name.ilike(f"%{search}%"))
         )
 
-    users = query.offset(skip).limit(limit).all()
-    return users
+    if skip is not None:
+        # старые клиенты листают через ?skip=&limit= - отдаём OFFSET-страницу в том же порядке
+        response.headers["Deprecation"] = "true"
+        return query.order_by(User.created_at, User.id).offset(skip).limit(page.limit).all()
+
+    users = keyset(query, page, User.created_at, User.id).all()
+    return page_rows(users, page, response, key=lambda u: (u.created_at, u.id))
 
 
 @router.get("/{user_id}", response_model=UserAdminResponse)
@@ -69,6 +85,9 @@ def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # роль и статус зашиты в токены - при их смене старые токены отзываем
+    access_before = (user.role, user.is_active, user.is_blocked)
+
     # Обновляем поля
     if user_data.full_name:
         user.full_name = user_data.full_name
@@ -79,8 +98,11 @@ def update_user(
     if user_data.is_blocked is not None:
         user.is_blocked = user_data.is_blocked
 
+    if (user.role, user.is_active, user.is_blocked) != access_before:
+        revoke_user_tokens(user)
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.id)
     return user
 
 
@@ -101,11 +123,25 @@ def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
     if hard_delete:
+        # записи на курсы и работы удалятся каскадом - пересчитываем счётчики этих курсов
+        course_ids = {row.course_id for row in db.query(course_students.c.course_id).filter(
+            course_students.c.student_id == user_id
+        )}
+        course_ids.update(row.course_id for row in db.query(Assignment.course_id).join(
+            Submission, Submission.assignment_id == Assignment.id
+        ).filter(Submission.student_id == user_id).distinct())
+
         db.delete(user)
+        db.flush()
+        reconcile_counters(db, course_ids)
     else:
         user.is_active = False
+        revoke_user_tokens(user)
 
     db.commit()
+    invalidate_user_cache(user_id)
+    if hard_delete:
+        enrollment_index.drop_student(user_id)
     return {"message": "User deleted"}
 
 
@@ -124,7 +160,9 @@ def block_user(
         raise HTTPException(status_code=400, detail="Cannot block yourself")
 
     user.is_blocked = True
+    revoke_user_tokens(user)
     db.commit()
+    invalidate_user_cache(user_id)
     return {"message": "User blocked"}
 
 
@@ -141,6 +179,7 @@ def unblock_user(
 
     user.is_blocked = False
     db.commit()
+    invalidate_user_cache(user_id)
     return {"message": "User unblocked"}
 
 
@@ -169,6 +208,7 @@ def update_permissions(
         perms.can_manage_tests = permissions_data.can_manage_tests
         perms.can_view_analytics = permissions_data.can_view_analytics
         perms.can_manage_permissions = permissions_data.can_manage_permissions
+        revoke_user_tokens(user)
         db.commit()
         db.refresh(perms)
     else:
@@ -182,28 +222,39 @@ def update_permissions(
             can_manage_permissions=permissions_data.can_manage_permissions
         )
         db.add(perms)
+        revoke_user_tokens(user)
         db.commit()
         db.refresh(perms)
 
+    invalidate_user_cache(user_id)
     return perms
 
 
 @router.post("/{user_id}/reset-password")
-def reset_password(
+async def reset_password(
     user_id: UUID,
     current_user: User = Depends(check_permission("can_manage_users")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Сбросить пароль пользователя"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
+    # соединение из пула не держим, пока bcrypt считает хеш
+    await db.rollback()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Генерируем временный пароль
     temp_password = secrets.token_urlsafe(12)
-    user.hashed_password = get_password_hash(temp_password)
+    hashed_password = await get_password_hash_async(temp_password)
 
-    db.commit()
+    user = await db.get(User, user_id, populate_existing=True)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.hashed_password = hashed_password
+    revoke_user_tokens(user)
+
+    await db.commit()
+    invalidate_user_cache(user_id)
 
     return {
         "message": "Password reset successfully",
@@ -1,72 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from uuid import UUID
 from typing import List, Dict
 
-from app.database import get_db
+from app.database import get_async_read_db
 from app.models.user import User
 from app.models.course import Course, course_students
+from app.models.course_counter import CourseCounter
 from app.models.assignment import Assignment
 from app.models.submission import Submission
 from app.models.grade import Grade
+from app.utils.conditional import make_etag, conditional_response
 from app.utils.dependencies import get_current_teacher
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/courses/{course_id}/stats")
-def get_course_stats(
+async def get_course_stats(
     course_id: UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Получить статистику по курсу"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
+    """Получить статистику по курсу.
+
+    Берётся из course_counters (их ведут пути записи); updated_at - момент
+    последнего изменения счётчиков, т.е. актуальность статистики.
+    """
+    row = (await db.execute(
+        select(Course, CourseCounter)
+        .outerjoin(CourseCounter, CourseCounter.course_id == Course.id)
+        .where(Course.id == course_id)
+    )).first()
+
+    if not row:
         raise HTTPException(status_code=404, detail="Course not found")
 
+    course, counters = row
     if course.teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    students_count = db.query(func.count(course_students.c.student_id)).filter(
-        course_students.c.course_id == course_id
-    ).scalar() or 0
-
-    assignments_count = db.query(func.count(Assignment.id)).filter(
-        Assignment.course_id == course_id
-    ).scalar() or 0
-
-    total_submissions = db.query(func.count(Submission.id))\
-        .join(Assignment, Submission.assignment_id == Assignment.id)\
-        .filter(Assignment.course_id == course_id)\
-        .scalar() or 0
+    # счётчики ведутся путями записи - без COUNT/AVG по растущим таблицам
+    if counters is None:
+        counters = CourseCounter(students=0, assignments=0, submissions=0, graded=0, score_sum=0)
+    avg_score = counters.score_sum / counters.graded if counters.graded else 0
+    graded_ratio = counters.graded / counters.submissions if counters.submissions else 0
 
-    avg_score = db.query(func.avg(Grade.score))\
-        .join(Submission, Grade.submission_id == Submission.id)\
-        .join(Assignment, Submission.assignment_id == Assignment.id)\
-        .filter(Assignment.course_id == course_id)\
-        .scalar() or 0
+    # вкладка статистики перезапрашивает её при каждом открытии - отвечаем 304
+    etag = make_etag(course_id, course.updated_at, counters.updated_at, counters.students,
+                     counters.assignments, counters.submissions, counters.graded, counters.score_sum)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
 
     return {
         "course_id": course_id,
         "course_title": course.title,
-        "students_count": students_count,
-        "assignments_count": assignments_count,
-        "total_submissions": total_submissions,
-        "average_score": round(avg_score, 2)
+        "students_count": counters.students,
+        "assignments_count": counters.assignments,
+        "total_submissions": counters.submissions,
+        "graded_count": counters.graded,
+        "graded_ratio": round(graded_ratio, 4),
+        "average_score": round(avg_score, 2),
+        "updated_at": counters.updated_at
     }
 
 
 @router.get("/courses/{course_id}/student-progress")
-def get_student_progress(
+async def get_student_progress(
     course_id: UUID,
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить прогресс студентов по курсу"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -74,26 +84,27 @@ def get_student_progress(
     if course.teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    assignments_count = db.query(func.count(Assignment.id)).filter(
-        Assignment.course_id == course_id
-    ).scalar() or 1
-
-    progress_data = db.query(
-        User.id,
-        User.full_name,
-        func.count(Submission.id).label('submissions_count'),
-        func.count(Grade.id).label('graded_count'),
-        func.avg(Grade.score).label('avg_score')
-    ).select_from(course_students)\
-        .join(User, course_students.c.student_id == User.id)\
+    assignments_count = await db.scalar(
+        select(func.count(Assignment.id)).where(Assignment.course_id == course_id)
+    ) or 1
+
+    progress_data = (await db.execute(
+        select(
+            User.id,
+            User.full_name,
+            func.count(Submission.id).label('submissions_count'),
+            func.count(Grade.id).label('graded_count'),
+            func.avg(Grade.score).label('avg_score')
+        ).select_from(course_students)
+        .join(User, course_students.c.student_id == User.id)
         .outerjoin(Submission, (Submission.student_id == User.id) &
                    (Submission.assignment_id.in_(
-                       db.query(Assignment.id).filter(Assignment.course_id == course_id)
-                   )))\
-        .outerjoin(Grade, Grade.submission_id == Submission.id)\
-        .filter(course_students.c.course_id == course_id)\
-        .group_by(User.id, User.full_name)\
-        .all()
+                       select(Assignment.id).where(Assignment.course_id == course_id)
+                   )))
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(course_students.c.course_id == course_id)
+        .group_by(User.id, User.full_name)
+    )).all()
 
     result = []
     for student_id, student_name, submissions_count, graded_count, avg_score in progress_data:
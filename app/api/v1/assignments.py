@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, literal_column, cast, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import undefer
+from typing import List, Optional
+from datetime import datetime
 from uuid import UUID
+import uuid
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User
 from app.models.course import Course, course_students
 from app.models.assignment import Assignment
-from app.models.submission import Submission
+from app.models.submission import Submission, SubmissionStatus
 from app.models.grade import Grade
 from app.schemas.assignment import (
     AssignmentCreate,
@@ -15,106 +21,223 @@ from app.schemas.assignment import (
     AssignmentResponse,
     SubmissionCreate,
     SubmissionResponse,
-    SubmissionWithGrade
+    SubmissionListItem,
+    DashboardCourse,
+    DashboardAssignment,
+    StudentDashboardResponse
 )
 from app.utils.dependencies import get_current_user, get_current_teacher
+from app.utils.conditional import make_etag, conditional_response
+from app.utils.dashboard_cache import get_dashboard_page, set_dashboard_page, invalidate_dashboard
+from app.utils.course_counters import bump_course_counters, assignment_counter_deltas
+from app.utils.enrollment_index import is_enrolled, get_student_course_ids
+from app.utils.ownership import OwnedAssignment, get_owned_course, get_owned_assignment
+from app.utils.pagination import NEXT_CURSOR_HEADER, PageParams, keyset, page_rows
 
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
-# == ДЛЯ СТУДЕНТОВ == 
+NO_DEADLINE = datetime(9999, 12, 31)
+
+# == ДЛЯ СТУДЕНТОВ ==
 
 @router.post("/{assignment_id}/submit", response_model=SubmissionResponse)
-def submit_assignment(
+async def submit_assignment(
     assignment_id: UUID,
     submission_data: SubmissionCreate,
+    resubmit: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Сдать работу по заданию (только для студентов)"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    enrolled = db.query(course_students).filter(
-        course_students.c.course_id == assignment.course_id,
-        course_students.c.student_id == current_user.id
-    ).first()
+    """Сдать работу по заданию (только для студентов).
+
+    resubmit=true заменяет уже сданную работу, пока она не проверена.
+    """
+    now = datetime.utcnow()
+
+    # задание существует и студент записан на его курс
+    target = (
+        select(Assignment.id, Assignment.course_id)
+        .join(course_students, (course_students.c.course_id == Assignment.course_id)
+              & (course_students.c.student_id == current_user.id))
+        .where(Assignment.id == assignment_id)
+        .cte("target")
+    )
 
-    if not enrolled:
+    insert_stmt = pg_insert(Submission).from_select(
+        ["id", "assignment_id", "student_id", "content", "file_url", "status", "submitted_at", "updated_at"],
+        select(
+            literal(uuid.uuid4(), Submission.id.type),
+            target.c.id,
+            literal(current_user.id, Submission.student_id.type),
+            literal(submission_data.content, Submission.content.type),
+            literal(submission_data.file_url, Submission.file_url.type),
+            cast(literal(SubmissionStatus.pending.value), Submission.status.type),
+            literal(now, Submission.submitted_at.type),
+            literal(now, Submission.updated_at.type)
+        )
+    )
+    # повторную сдачу отсекает уникальный индекс (assignment_id, student_id)
+    if resubmit:
+        insert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[Submission.assignment_id, Submission.student_id],
+            set_={
+                "content": insert_stmt.excluded.content,
+                "file_url": insert_stmt.excluded.file_url,
+                "submitted_at": insert_stmt.excluded.submitted_at,
+                "updated_at": insert_stmt.excluded.updated_at,
+            },
+            where=Submission.status == SubmissionStatus.pending
+        )
+    else:
+        insert_stmt = insert_stmt.on_conflict_do_nothing(
+            index_elements=[Submission.assignment_id, Submission.student_id]
+        )
+
+    written = insert_stmt.returning(
+        *Submission.__table__.c,
+        literal_column("xmax = 0").label("inserted")
+    ).cte("written")
+
+    row = (await db.execute(
+        select(target.c.course_id, written).select_from(target.outerjoin(written, true()))
+    )).first()
+
+    if row is None:
+        if await db.get(Assignment, assignment_id) is None:
+            raise HTTPException(status_code=404, detail="Assignment not found")
         raise HTTPException(status_code=403, detail="You are not enrolled in this course")
 
-    # работа не сдана
-    existing_submission = db.query(Submission).filter(
-        Submission.assignment_id == assignment_id,
-        Submission.student_id == current_user.id
-    ).first()
-
-    if existing_submission:
+    if row.id is None:
+        await db.rollback()
+        if resubmit:
+            raise HTTPException(status_code=400, detail="Submission has already been reviewed")
         raise HTTPException(status_code=400, detail="You have already submitted this assignment")
 
-    # create submission
-    new_submission = Submission(
-        assignment_id=assignment_id,
-        student_id=current_user.id,
-        content=submission_data.content,
-        file_url=submission_data.file_url,
-        status="pending"
-    )
+    if row.inserted:
+        await bump_course_counters(db, row.course_id, submissions=1, pending=1)
+    await db.commit()
+    invalidate_dashboard(current_user.id)
 
-    db.add(new_submission)
-    db.commit()
-    db.refresh(new_submission)
-
-    return new_submission
+    return SubmissionResponse.model_validate(row)
 
 
 @router.get("/my-assignments", response_model=List[AssignmentResponse])
-def get_my_assignments(
+async def get_my_assignments(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить все задания на курсах, на которых записан студент"""
     # курсы студента
-    enrolled_courses = db.query(course_students.c.course_id).filter(
-        course_students.c.student_id == current_user.id
-    ).all()
-
-    course_ids = [course_id for (course_id,) in enrolled_courses]
+    course_ids = await get_student_course_ids(db, current_user.id)
 
     if not course_ids:
         return []
 
     # задания со всех его курсов
-    assignments = db.query(Assignment).filter(
-        Assignment.course_id.in_(course_ids)
-    ).all()
+    stmt = keyset(
+        select(Assignment).where(Assignment.course_id.in_(course_ids)),
+        page, Assignment.created_at, Assignment.id
+    )
+    assignments = (await db.scalars(stmt)).all()
+
+    return page_rows(assignments, page, response, key=lambda a: (a.created_at, a.id))
 
-    return assignments
+
+@router.get("/dashboard", response_model=StudentDashboardResponse)
+async def get_student_dashboard(
+    response: Response,
+    page: PageParams = Depends(),
+    upcoming_only: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Дашборд студента: задания его курсов со статусом сдачи и оценкой, по дедлайну"""
+    page_key = (page.cursor, page.limit, upcoming_only)
+    cached = get_dashboard_page(current_user.id, page_key)
+    if cached is not None:
+        payload, next_cursor = cached
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return payload
+
+    # задания без дедлайна - в конце списка
+    deadline_key = func.coalesce(Assignment.deadline, NO_DEADLINE)
+    stmt = (
+        select(
+            Assignment.id, Assignment.title, Assignment.description, Assignment.max_score, Assignment.deadline,
+            Course.id.label("course_id"), Course.title.label("course_title"),
+            Submission.id.label("submission_id"), Submission.status, Submission.submitted_at,
+            Grade.score, Grade.comment
+        )
+        .select_from(course_students)
+        .join(Course, Course.id == course_students.c.course_id)
+        .join(Assignment, Assignment.course_id == Course.id)
+        .outerjoin(Submission, (Submission.assignment_id == Assignment.id) & (Submission.student_id == current_user.id))
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(course_students.c.student_id == current_user.id)
+    )
+    now = datetime.utcnow()
+    if upcoming_only:
+        stmt = stmt.where(Assignment.deadline >= now)
+
+    rows = page_rows(
+        (await db.execute(keyset(stmt, page, deadline_key, Assignment.id))).all(), page, response,
+        key=lambda row: (row.deadline or NO_DEADLINE, row.id)
+    )
+
+    assignments = [
+        DashboardAssignment(
+            assignment_id=row.id,
+            title=row.title,
+            description=row.description,
+            max_score=row.max_score,
+            deadline=row.deadline,
+            course_id=row.course_id,
+            course_title=row.course_title,
+            submission_id=row.submission_id,
+            status=row.status.value if row.status else "not_submitted",
+            submitted_at=row.submitted_at,
+            grade=row.score,
+            grade_comment=row.comment
+        )
+        for row in rows
+    ]
+    courses = {item.course_id: DashboardCourse(id=item.course_id, title=item.course_title) for item in assignments}
+    payload = StudentDashboardResponse(
+        courses=list(courses.values()),
+        assignments=assignments,
+        upcoming=[
+            item for item in assignments
+            if item.status == "not_submitted" and item.deadline and item.deadline >= now
+        ]
+    ).model_dump()
+
+    set_dashboard_page(current_user.id, page_key, payload, response.headers.get(NEXT_CURSOR_HEADER))
+    return payload
 
 
 @router.get("/{assignment_id}/my-submission", response_model=SubmissionResponse)
-def get_my_submission(
+async def get_my_submission(
     assignment_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Получить свою сданную работу по заданию"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.get(Assignment, assignment_id)
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    enrolled = db.query(course_students).filter(
-        course_students.c.course_id == assignment.course_id,
-        course_students.c.student_id == current_user.id
-    ).first()
-
-    if not enrolled:
+    if not await is_enrolled(db, assignment.course_id, current_user.id):
         raise HTTPException(status_code=403, detail="You are not enrolled in this course")
 
-    submission = db.query(Submission).filter(
-        Submission.assignment_id == assignment_id,
-        Submission.student_id == current_user.id
-    ).first()
+    submission = await db.scalar(
+        select(Submission).options(undefer(Submission.content)).where(
+            Submission.assignment_id == assignment_id,
+            Submission.student_id == current_user.id
+        )
+    )
 
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
@@ -123,21 +246,13 @@ def get_my_submission(
 
 
 @router.post("/courses/{course_id}/assignments", response_model=AssignmentResponse)
-def create_assignment(
+async def create_assignment(
     course_id: UUID,
     assignment_data: AssignmentCreate,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Создание задания для курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
     new_assignment = Assignment(
         course_id=course_id,
         title=assignment_data.title,
@@ -147,20 +262,24 @@ def create_assignment(
     )
 
     db.add(new_assignment)
-    db.commit()
-    db.refresh(new_assignment)
+    await bump_course_counters(db, course_id, assignments=1)
+    await db.commit()
+    await db.refresh(new_assignment)
 
     return new_assignment
 
 
 @router.get("/courses/{course_id}/assignments", response_model=List[AssignmentResponse])
-def get_course_assignments(
+async def get_course_assignments(
     course_id: UUID,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить все задания курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -168,45 +287,50 @@ def get_course_assignments(
     if course.teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    assignments = db.query(Assignment).filter(Assignment.course_id == course_id).all()
-    return assignments
+    # версия списка - число строк и max(updated_at): дешёвый агрегат по индексу course_id
+    count, last_updated = (await db.execute(
+        select(func.count(Assignment.id), func.max(Assignment.updated_at))
+        .where(Assignment.course_id == course_id)
+    )).one()
+    etag = make_etag(course_id, count, last_updated, page.cursor, page.limit)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    stmt = keyset(
+        select(Assignment).where(Assignment.course_id == course_id),
+        page, Assignment.created_at, Assignment.id
+    )
+    assignments = (await db.scalars(stmt)).all()
+    return page_rows(assignments, page, response, key=lambda a: (a.created_at, a.id))
 
 
 @router.get("/{assignment_id}", response_model=AssignmentResponse)
-def get_assignment(
+async def get_assignment(
     assignment_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    owned: OwnedAssignment = Depends(get_owned_assignment)
 ):
     """Получить детали задания"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = owned.assignment
+    etag = make_etag(assignment.id, assignment.updated_at)
+    not_modified = conditional_response(request, response, etag, last_modified=assignment.updated_at)
+    if not_modified:
+        return not_modified
 
     return assignment
 
 
 @router.put("/{assignment_id}", response_model=AssignmentResponse)
-def update_assignment(
+async def update_assignment(
     assignment_id: UUID,
     assignment_data: AssignmentUpdate,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    owned: OwnedAssignment = Depends(get_owned_assignment),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Обновление задания"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = owned.assignment
 
     # Обновляем
     if assignment_data.title:
@@ -218,70 +342,70 @@ def update_assignment(
     if assignment_data.deadline:
         assignment.deadline = assignment_data.deadline
 
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
 
     return assignment
 
 
 @router.delete("/{assignment_id}")
-def delete_assignment(
+async def delete_assignment(
     assignment_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    owned: OwnedAssignment = Depends(get_owned_assignment),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Удаление задания"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
-
-    if not assignment:
-        raise HTTPException(status_code=404, detail="Assignment not found")
-
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = owned.assignment
 
-    db.delete(assignment)
-    db.commit()
+    deltas = await assignment_counter_deltas(db, assignment.id)
+    await bump_course_counters(db, assignment.course_id, **deltas)
+    await db.delete(assignment)
+    await db.commit()
 
     return {"message": "Assignment deleted"}
 
 
-@router.get("/{assignment_id}/submissions", response_model=List[SubmissionWithGrade])
-def get_assignment_submissions(
+@router.get("/{assignment_id}/submissions", response_model=List[SubmissionListItem])
+async def get_assignment_submissions(
     assignment_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
+    status: Optional[SubmissionStatus] = None,
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Получить все сданные работы по заданию"""
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    """Получить сданные работы по заданию (превью ответа; целиком - GET /submissions/{id})"""
+    teacher_id = await db.scalar(
+        select(Course.teacher_id)
+        .join(Assignment, Assignment.course_id == Course.id)
+        .where(Assignment.id == assignment_id)
+    )
 
-    if not assignment:
+    if not teacher_id:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
+    if teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    submissions = db.query(Submission)\
-        .join(User, Submission.student_id == User.id)\
-        .outerjoin(Grade, Grade.submission_id == Submission.id)\
-        .filter(Submission.assignment_id == assignment_id)\
-        .add_columns(User.full_name, Grade.score, Grade.comment)\
-        .all()
-
-    result = []
-    for sub, student_name, grade_score, grade_comment in submissions:
-        result.append({
-            "id": sub.id,
-            "assignment_id": sub.assignment_id,
-            "student_id": sub.student_id,
-            "student_name": student_name,
-            "content": sub.content,
-            "file_url": sub.file_url,
-            "status": sub.status,
-            "submitted_at": sub.submitted_at,
-            "grade": grade_score,
-            "grade_comment": grade_comment
-        })
-
-    return result
\ No newline at end of file
+    # octet_length берёт размер из заголовка TOAST, substr читает только начало значения
+    stmt = (
+        select(
+            Submission.id, Submission.assignment_id, Submission.student_id,
+            User.full_name.label("student_name"), Submission.status, Submission.submitted_at,
+            Grade.score.label("grade"), Grade.comment.label("grade_comment"),
+            func.coalesce(func.octet_length(Submission.content), 0).label("content_length"),
+            func.substr(Submission.content, 1, settings.SUBMISSION_PREVIEW_CHARS).label("content_preview"),
+            Submission.file_url.isnot(None).label("has_file")
+        )
+        .join(User, Submission.student_id == User.id)
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(Submission.assignment_id == assignment_id)
+    )
+    if status is not None:
+        stmt = stmt.where(Submission.status == status)
+
+    rows = page_rows(
+        (await db.execute(keyset(stmt, page, Submission.submitted_at, Submission.id))).all(), page, response,
+        key=lambda row: (row.submitted_at, row.id)
+    )
+    return [dict(row._mapping) for row in rows]
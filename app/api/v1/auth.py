@@ -1,26 +1,77 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from uuid import UUID
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
-from app.schemas.auth import UserRegister, UserLogin, Token, UserResponse
-from app.utils.auth import verify_password, get_password_hash, create_access_token
+from app.models.admin_permission import AdminPermission, permissions_to_bitmask
+from app.schemas.auth import UserRegister, UserLogin, Token, TokenRefresh, UserResponse
+from app.utils.auth import (
+    verify_password_async,
+    get_password_hash_async,
+    create_user_tokens,
+    decode_access_token
+)
 from app.utils.dependencies import get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def _issue_tokens(user: User, db: AsyncSession) -> dict:
+    """Выпустить токены с ролью и маской прав админа"""
+    perms_mask = 0
+    if user.role == "admin":
+        perms = await db.scalar(select(AdminPermission).where(AdminPermission.user_id == user.id))
+        perms_mask = permissions_to_bitmask(perms)
+    return create_user_tokens(user, perms_mask)
+
+
+async def _authenticate(db: AsyncSession, email: str, password: str, headers: dict = None) -> User:
+    """Проверить email и пароль; вернуть пользователя (сессия снова читает его после bcrypt)"""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers=headers
+    )
+    row = (await db.execute(select(User.id, User.hashed_password).where(User.email == email))).first()
+    # соединение из пула не держим, пока bcrypt считает хеш
+    await db.rollback()
+    if not row:
+        raise invalid
+
+    user_id, hashed_password = row
+    password_ok, new_hash = await verify_password_async(password, hashed_password)
+    if not password_ok:
+        raise invalid
+
+    user = await db.get(User, user_id, populate_existing=True)
+    if user is None:
+        raise invalid
+    if user.is_blocked or not user.is_active:
+        raise HTTPException(status_code=403, detail="User is blocked or inactive")
+
+    # пересчитываем хеш, если изменилась стоимость bcrypt (и пароль не сменили, пока считали)
+    if new_hash and user.hashed_password == hashed_password:
+        user.hashed_password = new_hash
+    user.last_login = datetime.utcnow()
+    return user
+
+
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Регистрация нового пользователя"""
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User.id).where(User.email == user_data.email))
+    # соединение из пула не держим, пока bcrypt считает хеш
+    await db.rollback()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_pwd = get_password_hash(user_data.password)
+    hashed_pwd = await get_password_hash_async(user_data.password)
 
+    # гонку двух регистраций одного email ловит уникальный индекс (IntegrityError -> 400)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_pwd,
@@ -29,77 +80,67 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 
 @router.post("/token", response_model=Token)
-def token(
+async def token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get token"""
-    user = db.query(User).filter(User.email == form_data.username).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    if not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = await _authenticate(db, form_data.username, form_data.password, headers={"WWW-Authenticate": "Bearer"})
+    tokens = await _issue_tokens(user, db)
+    await db.commit()
 
-    if user.is_blocked or not user.is_active:
-        raise HTTPException(status_code=403, detail="User is blocked or inactive")
-
-    user.last_login = datetime.utcnow()
-    db.commit()
-
-    access_token = create_access_token(data={"sub": user.email})
-
-    return {"access_token": access_token, "token_type": "bearer"}
+    return tokens
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Вход пользователя (JSON endpoint для фронтенда)"""
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await _authenticate(db, credentials.email, credentials.password)
+    tokens = await _issue_tokens(user, db)
+    await db.commit()
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
+    return tokens
 
-    if not verify_password(credentials.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
 
-    if user.is_blocked or not user.is_active:
-        raise HTTPException(status_code=403, detail="User is blocked or inactive")
+@router.post("/refresh", response_model=Token)
+async def refresh(token_data: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
+    """Обновить access-токен по refresh-токену"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-    user.last_login = datetime.utcnow()
-    db.commit()
+    payload = decode_access_token(token_data.refresh_token, token_type="refresh")
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        raise credentials_exception
+
+    user = await db.get(User, user_id)
+    if user is None or payload.get("ver", 0) != (user.token_version or 0):
+        raise credentials_exception
 
-    access_token = create_access_token(data={"sub": user.email})
+    if user.is_blocked or not user.is_active:
+        raise HTTPException(status_code=403, detail="User is blocked or inactive")
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await _issue_tokens(user, db)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """Получение информации о текущем пользователе"""
     return current_user
@@ -1,19 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from collections import Counter
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ValidationError
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User
 from app.models.course import Course, course_students
-from app.models.assignment import Assignment
-from app.schemas.course import CourseCreate, CourseUpdate, CourseResponse, CourseDetailResponse
+from app.models.course_counter import CourseCounter
+from app.schemas.course import (
+    CourseCreate,
+    CourseUpdate,
+    CourseResponse,
+    CourseListResponse,
+    CourseDetailResponse,
+    BulkEnrollRequest,
+    BulkEnrollRow,
+    BulkEnrollResponse
+)
 from app.utils.dependencies import get_current_user, get_current_teacher
+from app.utils.conditional import make_etag, conditional_response
+from app.utils.course_counters import bump_course_counters
+from app.utils.course_counts import get_course_counts
+from app.utils.csv_stream import iter_csv_rows
+from app.utils.dashboard_cache import invalidate_dashboard
+from app.utils.enrollment_index import enrollment_index, get_student_course_ids
+from app.utils.ownership import get_owned_course
+from app.utils.pagination import PageParams, keyset, page_rows
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+_BULK_LOOKUP_CHUNK = 5000
+_BULK_INSERT_CHUNK = 1000
+_CSV_HEADERS = {"email", "id", "student_id", "student"}
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _read_csv_values(request: Request) -> List[str]:
+    values = []
+    async for row in iter_csv_rows(request.stream()):
+        value = row[0].strip()
+        if not values and value.lower() in _CSV_HEADERS:
+            continue
+        values.append(value)
+        if len(values) > settings.BULK_ENROLL_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"Too many rows (max {settings.BULK_ENROLL_MAX_ROWS})")
+    return values
+
 
 class AddStudentByEmail(BaseModel):
     email: EmailStr
@@ -29,10 +71,10 @@ class StudentResponse(BaseModel):
 
 
 @router.post("/", response_model=CourseResponse)
-def create_course(
+async def create_course(
     course_data: CourseCreate,
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Создание нового курса (только для преподавателей)"""
     new_course = Course(
@@ -42,178 +84,245 @@ def create_course(
     )
 
     db.add(new_course)
-    db.commit()
-    db.refresh(new_course)
+    await db.flush()
+    db.add(CourseCounter(course_id=new_course.id))
+    await db.commit()
+    await db.refresh(new_course)
 
     return new_course
 
 
-@router.get("/", response_model=List[CourseResponse])
-def get_my_courses(
+@router.get("/", response_model=List[CourseListResponse])
+async def get_my_courses(
+    response: Response,
+    page: PageParams = Depends(),
+    include_counts: bool = False,
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить все курсы преподавателя"""
-    courses = db.query(Course).filter(Course.teacher_id == current_user.id).all()
-    return courses
+    stmt = keyset(select(Course).where(Course.teacher_id == current_user.id), page, Course.created_at, Course.id)
+    courses = page_rows((await db.scalars(stmt)).all(), page, response, key=lambda c: (c.created_at, c.id))
+    if not include_counts:
+        return courses
+
+    counts = await get_course_counts(db, [course.id for course in courses])
+    return [
+        CourseListResponse.model_validate(course).model_copy(update=counts.get(course.id, {}))
+        for course in courses
+    ]
 
 
 @router.get("/{course_id}", response_model=CourseDetailResponse)
-def get_course(
+async def get_course(
     course_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Получить детали курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    counts = await get_course_counts(db, [course_id])
 
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    # Проверяем что это курс текущего преподавателя
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    students_count = db.query(func.count(course_students.c.student_id)).filter(
-        course_students.c.course_id == course_id
-    ).scalar() or 0
-
-    assignments_count = db.query(func.count(Assignment.id)).filter(
-        Assignment.course_id == course_id
-    ).scalar() or 0
+    # счётчики входят в ответ, поэтому и в ETag; Last-Modified курса их не отражает
+    etag = make_etag(course.id, course.updated_at, *counts.get(course_id, {}).values())
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
 
     return {
         **course.__dict__,
-        "students_count": students_count,
-        "assignments_count": assignments_count
+        **counts.get(course_id, {})
     }
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
-def update_course(
+async def update_course(
     course_id: UUID,
     course_data: CourseUpdate,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Обновление курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
     update_data = course_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(course, field, value)
 
-    db.commit()
-    db.refresh(course)
+    await db.commit()
+    await db.refresh(course)
 
     return course
 
 
 @router.delete("/{course_id}")
-def delete_course(
+async def delete_course(
     course_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Удаление курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
+    await db.delete(course)
+    await db.commit()
+    enrollment_index.drop_course(course_id)
 
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    return {"message": "Course deleted successfully"}
 
-    db.delete(course)
-    db.commit()
 
-    return {"message": "Course deleted successfully"}
+@router.post("/{course_id}/students/bulk", response_model=BulkEnrollResponse)
+async def add_students_bulk(
+    course_id: UUID,
+    request: Request,
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Массовая запись на курс.
+
+    JSON: {"students": ["email или id", ...]}; CSV (Content-Type: text/csv):
+    email или id в первой колонке, заголовок необязателен.
+    """
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        values = await _read_csv_values(request)
+    else:
+        try:
+            values = BulkEnrollRequest.model_validate_json(await request.body()).students
+        except ValidationError:
+            raise HTTPException(status_code=422, detail='Expected JSON body {"students": [...]} or text/csv')
+
+    values = [value.strip() for value in values if value.strip()]
+    if len(values) > settings.BULK_ENROLL_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows (max {settings.BULK_ENROLL_MAX_ROWS})")
+
+    # строка -> UUID или email
+    keys = []
+    for value in values:
+        try:
+            keys.append(UUID(value))
+        except ValueError:
+            keys.append(value)
+
+    ids = list({key for key in keys if isinstance(key, UUID)})
+    emails = list({key for key in keys if not isinstance(key, UUID)})
+    found = {}
+    for chunk in _chunks(ids, _BULK_LOOKUP_CHUNK):
+        for user_id in (await db.scalars(select(User.id).where(User.id.in_(chunk)))).all():
+            found[user_id] = user_id
+    for chunk in _chunks(emails, _BULK_LOOKUP_CHUNK):
+        for user_id, email in (await db.execute(select(User.id, User.email).where(User.email.in_(chunk)))).all():
+            found[email] = user_id
+
+    # уже записанных пропускает ON CONFLICT, RETURNING отдаёт только новые записи
+    student_ids = list(dict.fromkeys(found[key] for key in keys if key in found))
+    enrolled = set()
+    enrolled_at = datetime.utcnow()
+    for chunk in _chunks(student_ids, _BULK_INSERT_CHUNK):
+        stmt = pg_insert(course_students).values([
+            {"course_id": course_id, "student_id": student_id, "enrolled_at": enrolled_at}
+            for student_id in chunk
+        ]).on_conflict_do_nothing().returning(course_students.c.student_id)
+        enrolled.update((await db.scalars(stmt)).all())
+    await bump_course_counters(db, course_id, students=len(enrolled))
+    await db.commit()
+
+    for student_id in enrolled:
+        enrollment_index.add(course_id, student_id)
+        invalidate_dashboard(student_id)
+
+    rows = []
+    reported = set()
+    for value, key in zip(values, keys):
+        student_id = found.get(key)
+        if student_id is None:
+            status = "not_found"
+        elif student_id in enrolled and student_id not in reported:
+            status = "enrolled"
+            reported.add(student_id)
+        else:
+            status = "already_enrolled"
+        rows.append(BulkEnrollRow(value=value, status=status, student_id=student_id))
+
+    counts = Counter(row.status for row in rows)
+    return BulkEnrollResponse(
+        enrolled=counts["enrolled"],
+        already_enrolled=counts["already_enrolled"],
+        not_found=counts["not_found"],
+        rows=rows
+    )
 
 
 @router.post("/{course_id}/students/{student_id}")
-def add_student_to_course(
+async def add_student_to_course(
     course_id: UUID,
     student_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Добавить студента на курс по ID"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    student = db.query(User).filter(User.id == student_id).first()
+    student = await db.get(User, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    existing = db.query(course_students).filter(
-        course_students.c.course_id == course_id,
-        course_students.c.student_id == student_id
-    ).first()
+    existing = (await db.execute(
+        select(course_students).where(
+            course_students.c.course_id == course_id,
+            course_students.c.student_id == student_id
+        )
+    )).first()
 
     if existing:
         raise HTTPException(status_code=400, detail="Student already enrolled")
 
     stmt = course_students.insert().values(course_id=course_id, student_id=student_id)
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await bump_course_counters(db, course_id, students=1)
+    await db.commit()
+    enrollment_index.add(course_id, student_id)
+    invalidate_dashboard(student_id)
 
     return {"message": "Student added successfully"}
 
 
 @router.post("/{course_id}/students", response_model=dict)
-def add_student_by_email(
+async def add_student_by_email(
     course_id: UUID,
     student_data: AddStudentByEmail,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Добавить студента на курс по email"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    student = db.query(User).filter(User.email == student_data.email).first()
+    student = await db.scalar(select(User).where(User.email == student_data.email))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    existing = db.query(course_students).filter(
-        course_students.c.course_id == course_id,
-        course_students.c.student_id == student.id
-    ).first()
+    existing = (await db.execute(
+        select(course_students).where(
+            course_students.c.course_id == course_id,
+            course_students.c.student_id == student.id
+        )
+    )).first()
 
     if existing:
         raise HTTPException(status_code=400, detail="Student already enrolled")
 
     stmt = course_students.insert().values(course_id=course_id, student_id=student.id)
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await bump_course_counters(db, course_id, students=1)
+    await db.commit()
+    enrollment_index.add(course_id, student.id)
+    invalidate_dashboard(student.id)
 
     return {"message": "Student added successfully", "student": StudentResponse.model_validate(student)}
 
 
 @router.get("/{course_id}/students", response_model=List[StudentResponse])
-def get_course_students(
+async def get_course_students(
     course_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить список студентов на курсе"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -221,36 +330,31 @@ def get_course_students(
     if course.teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    students = db.query(User).join(
+    stmt = select(User).join(
         course_students,
         course_students.c.student_id == User.id
-    ).filter(
+    ).where(
         course_students.c.course_id == course_id
-    ).all()
+    )
+    students = (await db.scalars(keyset(stmt, page, User.created_at, User.id))).all()
 
-    return students
+    return page_rows(students, page, response, key=lambda u: (u.created_at, u.id))
 
 
 @router.delete("/{course_id}/students/{student_id}")
-def remove_student_from_course(
+async def remove_student_from_course(
     course_id: UUID,
     student_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Удалить студента с курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    existing = db.query(course_students).filter(
-        course_students.c.course_id == course_id,
-        course_students.c.student_id == student_id
-    ).first()
+    existing = (await db.execute(
+        select(course_students).where(
+            course_students.c.course_id == course_id,
+            course_students.c.student_id == student_id
+        )
+    )).first()
 
     if not existing:
         raise HTTPException(status_code=404, detail="Student not enrolled in this course")
@@ -259,32 +363,40 @@ def remove_student_from_course(
         course_students.c.course_id == course_id,
         course_students.c.student_id == student_id
     )
-    db.execute(stmt)
-    db.commit()
+    await db.execute(stmt)
+    await bump_course_counters(db, course_id, students=-1)
+    await db.commit()
+    enrollment_index.remove(course_id, student_id)
+    invalidate_dashboard(student_id)
 
     return {"message": "Student removed successfully"}
 
 
 @router.get("/all-students", response_model=List[StudentResponse])
-def get_all_students(
+async def get_all_students(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить список всех студентов"""
-    students = db.query(User).filter(User.role == "student").all()
-    return students
+    stmt = keyset(select(User).where(User.role == "student"), page, User.created_at, User.id)
+    students = (await db.scalars(stmt)).all()
+    return page_rows(students, page, response, key=lambda u: (u.created_at, u.id))
 
 @router.get("/my-courses", response_model=List[CourseResponse])
-def get_my_courses_as_student(
+async def get_my_courses_as_student(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить курсы на которых записан студент"""
-    courses = db.query(Course).join(
-        course_students,
-        course_students.c.course_id == Course.id
-    ).filter(
-        course_students.c.student_id == current_user.id
-    ).all()
+    course_ids = await get_student_course_ids(db, current_user.id)
+    if not course_ids:
+        return []
+
+    stmt = keyset(select(Course).where(Course.id.in_(course_ids)), page, Course.created_at, Course.id)
+    courses = (await db.scalars(stmt)).all()
 
-    return courses
\ No newline at end of file
+    return page_rows(courses, page, response, key=lambda c: (c.created_at, c.id))
@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Literal, Optional
+from uuid import UUID
+
+from app.database import get_async_read_db
+from app.models.user import User
+from app.models.course import Course, course_students
+from app.models.assignment import Assignment
+from app.models.submission import Submission
+from app.models.grade import Grade
+from app.utils.dependencies import get_current_teacher
+from app.utils.export_stream import MEDIA_TYPES, encode_csv, encode_ndjson, iter_partitions, attachment_headers
+
+router = APIRouter(prefix="/courses", tags=["export"])
+
+SUBMISSION_COLUMNS = {
+    "submission_id": Submission.id,
+    "assignment_id": Assignment.id,
+    "assignment_title": Assignment.title,
+    "student_id": User.id,
+    "student_email": User.email,
+    "student_name": User.full_name,
+    "status": Submission.status,
+    "submitted_at": Submission.submitted_at,
+    "score": Grade.score,
+    "max_score": Assignment.max_score,
+    "grade_comment": Grade.comment,
+    "graded_at": Grade.graded_at,
+    "file_url": Submission.file_url,
+    "content": Submission.content,
+}
+# тяжёлый content выгружается только по явному ?columns=...,content
+DEFAULT_SUBMISSION_COLUMNS = [name for name in SUBMISSION_COLUMNS if name != "content"]
+
+ExportFormat = Literal["csv", "ndjson"]
+
+
+async def _check_course(db: AsyncSession, course_id: UUID, current_user: User) -> Course:
+    course = await db.get(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if course.teacher_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return course
+
+
+def _parse_columns(columns: Optional[str]) -> list:
+    if not columns:
+        return DEFAULT_SUBMISSION_COLUMNS
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SUBMISSION_COLUMNS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown columns: {', '.join(unknown)}. Allowed: {', '.join(SUBMISSION_COLUMNS)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+@router.get("/{course_id}/export/submissions")
+async def export_submissions(
+    course_id: UUID,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    columns: Optional[str] = Query(None, description="Колонки через запятую (по умолчанию все, кроме content)"),
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Потоковая выгрузка сданных работ курса (CSV или NDJSON)"""
+    await _check_course(db, course_id, current_user)
+    names = _parse_columns(columns)
+
+    stmt = (
+        select(*(SUBMISSION_COLUMNS[name] for name in names))
+        .select_from(Submission)
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(User, User.id == Submission.student_id)
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(Assignment.course_id == course_id)
+        .order_by(Assignment.created_at, Assignment.id, Submission.submitted_at, Submission.id)
+    )
+
+    async def body():
+        if export_format == "csv":
+            yield encode_csv([names])
+        async for partition in iter_partitions(db, stmt):
+            if export_format == "csv":
+                yield encode_csv(partition)
+            else:
+                yield encode_ndjson(dict(zip(names, row)) for row in partition)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers=attachment_headers(f"submissions-{course_id}.{export_format}")
+    )
+
+
+@router.get("/{course_id}/export/gradebook")
+async def export_gradebook(
+    course_id: UUID,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Потоковая выгрузка ведомости: строка на студента, колонка на задание"""
+    await _check_course(db, course_id, current_user)
+
+    assignments = (await db.execute(
+        select(Assignment.id, Assignment.title)
+        .where(Assignment.course_id == course_id)
+        .order_by(Assignment.created_at, Assignment.id)
+    )).all()
+    positions = {row.id: i for i, row in enumerate(assignments)}
+
+    scores = (
+        select(Submission.student_id, Submission.assignment_id, Grade.score)
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(Grade, Grade.submission_id == Submission.id)
+        .where(Assignment.course_id == course_id)
+        .subquery()
+    )
+    # строки одного студента идут подряд - ведомость собирается по одному студенту
+    stmt = (
+        select(User.id, User.email, User.full_name, scores.c.assignment_id, scores.c.score)
+        .select_from(course_students)
+        .join(User, User.id == course_students.c.student_id)
+        .outerjoin(scores, scores.c.student_id == User.id)
+        .where(course_students.c.course_id == course_id)
+        .order_by(User.full_name, User.id)
+    )
+
+    def encode(students: list) -> bytes:
+        if export_format == "csv":
+            return encode_csv(
+                [student_id, email, name, *row_scores, sum(score for score in row_scores if score is not None)]
+                for student_id, email, name, row_scores in students
+            )
+        return encode_ndjson(
+            {
+                "student_id": student_id,
+                "student_email": email,
+                "student_name": name,
+                "scores": {
+                    str(assignment.id): score for assignment, score in zip(assignments, row_scores)
+                },
+                "total": sum(score for score in row_scores if score is not None),
+            }
+            for student_id, email, name, row_scores in students
+        )
+
+    async def body():
+        if export_format == "csv":
+            yield encode_csv([
+                ["student_id", "student_email", "student_name", *(row.title for row in assignments), "total"]
+            ])
+
+        current = None
+        async for partition in iter_partitions(db, stmt):
+            finished = []
+            for student_id, email, name, assignment_id, score in partition:
+                if current is None or current[0] != student_id:
+                    if current is not None:
+                        finished.append(current)
+                    current = (student_id, email, name, [None] * len(assignments))
+                # задание, созданное после выборки колонок, пропускаем
+                if assignment_id in positions:
+                    current[3][positions[assignment_id]] = score
+            if finished:
+                yield encode(finished)
+        if current is not None:
+            yield encode([current])
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers=attachment_headers(f"gradebook-{course_id}.{export_format}")
+    )
@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+from app.config import settings
+from app.database import get_async_db, get_async_read_db
+from app.models.user import User
+from app.models.course import Course
+from app.models.course_file import CourseFile
+from app.utils.auth import create_download_token, decode_access_token
+from app.utils.dependencies import get_current_user
+from app.utils.enrollment_index import is_enrolled
+from app.utils.file_store import receive_upload, blob_response
+
+router = APIRouter(prefix="/files", tags=["files"])
+
+
+class StoredFileResponse(BaseModel):
+    sha256: str
+    size: int
+    filename: Optional[str]
+    content_type: Optional[str]
+    url: str  # для file_url работы или материала
+
+
+class DownloadLink(BaseModel):
+    url: str  # работает без Authorization, пока не истёк срок
+    expires_in: int
+
+
+class StorageUsage(BaseModel):
+    course_id: UUID
+    used_bytes: int
+    quota_bytes: int
+
+
+def file_url(course_id: UUID, sha256: str) -> str:
+    return f"/api/v1/files/courses/{course_id}/{sha256}"
+
+
+async def _check_course_access(db: AsyncSession, course_id: UUID, current_user: User) -> Course:
+    """Файлы курса доступны его преподавателю, админу и записанным студентам"""
+    course = await db.get(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    if course.teacher_id == current_user.id or current_user.role == "admin":
+        return course
+    if not await is_enrolled(db, course_id, current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return course
+
+
+async def _used_bytes(db: AsyncSession, course_id: UUID) -> int:
+    return await db.scalar(
+        select(func.coalesce(func.sum(CourseFile.size), 0)).where(CourseFile.course_id == course_id)
+    )
+
+
+@router.post("/courses/{course_id}", response_model=StoredFileResponse)
+async def upload_file(
+    course_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Загрузить файл в хранилище курса (multipart/form-data, поле file).
+
+    Тело читается потоком: чанки сразу пишутся на диск с подсчётом sha256,
+    одинаковое содержимое хранится один раз. Полученный url передаётся в
+    file_url при сдаче работы или создании материала.
+    """
+    await _check_course_access(db, course_id, current_user)
+    remaining = settings.COURSE_STORAGE_QUOTA_BYTES - await _used_bytes(db, course_id)
+    # соединение не держим, пока идёт загрузка
+    await db.rollback()
+
+    if remaining <= 0:
+        raise HTTPException(status_code=413, detail="Course storage quota exceeded")
+    blob = await receive_upload(request, min(settings.UPLOAD_MAX_BYTES, remaining))
+
+    # квоту перепроверяем под блокировкой курса: параллельные загрузки не превысят её вместе
+    await db.execute(select(Course.id).where(Course.id == course_id).with_for_update())
+    exists = await db.scalar(
+        select(CourseFile.size).where(CourseFile.course_id == course_id, CourseFile.sha256 == blob.sha256)
+    )
+    if exists is None:
+        if await _used_bytes(db, course_id) + blob.size > settings.COURSE_STORAGE_QUOTA_BYTES:
+            await db.rollback()
+            raise HTTPException(status_code=413, detail="Course storage quota exceeded")
+        await db.execute(pg_insert(CourseFile).values(
+            course_id=course_id,
+            sha256=blob.sha256,
+            size=blob.size,
+            filename=blob.filename,
+            content_type=blob.content_type,
+            uploaded_by=current_user.id
+        ).on_conflict_do_nothing())
+    await db.commit()
+
+    return StoredFileResponse(**blob._asdict(), url=file_url(course_id, blob.sha256))
+
+
+@router.get("/courses/{course_id}/usage", response_model=StorageUsage)
+async def get_storage_usage(
+    course_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Занятое файлами курса место и квота"""
+    await _check_course_access(db, course_id, current_user)
+    return StorageUsage(
+        course_id=course_id,
+        used_bytes=await _used_bytes(db, course_id),
+        quota_bytes=settings.COURSE_STORAGE_QUOTA_BYTES
+    )
+
+
+@router.post("/courses/{course_id}/{sha256}/link", response_model=DownloadLink)
+async def create_download_link(
+    course_id: UUID,
+    sha256: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Подписанная ссылка на скачивание: обычная ссылка в браузере не передаёт Bearer-токен"""
+    await _check_course_access(db, course_id, current_user)
+    if not await db.get(CourseFile, (course_id, sha256)):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return DownloadLink(
+        url=f"/api/v1/files/download/{create_download_token(course_id, sha256)}",
+        expires_in=settings.DOWNLOAD_LINK_EXPIRE_SECONDS
+    )
+
+
+@router.api_route("/download/{token}", methods=["GET", "HEAD"])
+async def download_by_link(
+    token: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Скачать файл по подписанной ссылке (ETag, Range - как у обычного скачивания)"""
+    payload = decode_access_token(token, token_type="download")
+    if payload is None:
+        raise HTTPException(status_code=403, detail="Download link is invalid or expired")
+
+    try:
+        course_id = UUID(payload.get("course", ""))
+    except ValueError:
+        raise HTTPException(status_code=403, detail="Download link is invalid or expired")
+    stored = await db.get(CourseFile, (course_id, payload.get("sha", "")))
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return blob_response(request, stored.sha256, stored.size, stored.filename, stored.content_type)
+
+
+@router.api_route("/courses/{course_id}/{sha256}", methods=["GET", "HEAD"])
+async def download_file(
+    course_id: UUID,
+    sha256: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Скачать файл курса: ETag по sha256, Range (докачка и частичное чтение)"""
+    await _check_course_access(db, course_id, current_user)
+    stored = await db.get(CourseFile, (course_id, sha256))
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return blob_response(request, stored.sha256, stored.size, stored.filename, stored.content_type)
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from uuid import UUID
+
+from app.database import get_async_read_db
+from app.models.user import User
+from app.models.course import Course, course_students
+from app.models.course_counter import CourseCounter
+from app.models.assignment import Assignment
+from app.models.submission import Submission
+from app.models.grade import Grade
+from app.schemas.grade import GradebookMatrix
+from app.utils.conditional import make_etag, conditional_response
+from app.utils.dependencies import get_current_teacher
+
+router = APIRouter(prefix="/courses", tags=["gradebook"])
+
+
+@router.get("/{course_id}/gradebook", responses={200: {"model": GradebookMatrix}})
+async def get_gradebook(
+    course_id: UUID,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Журнал оценок курса: студенты x задания.
+
+    Ответ колоночный: массив id студентов, массив id заданий и плотный
+    построчный массив баллов (null - оценки нет). Версия журнала - время
+    последнего изменения оценок и счётчики курса из course_counters.
+    """
+    row = (await db.execute(
+        select(
+            Course.teacher_id,
+            CourseCounter.grades_updated_at,
+            CourseCounter.updated_at,
+            CourseCounter.students,
+            CourseCounter.assignments,
+            select(func.max(Assignment.updated_at))
+            .where(Assignment.course_id == course_id)
+            .scalar_subquery()
+        )
+        .outerjoin(CourseCounter, CourseCounter.course_id == Course.id)
+        .where(Course.id == course_id)
+    )).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    teacher_id, *version = row
+    if teacher_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    etag = make_etag(course_id, *version)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    assignments = (await db.execute(
+        select(Assignment.id, Assignment.max_score)
+        .where(Assignment.course_id == course_id)
+        .order_by(Assignment.created_at, Assignment.id)
+    )).all()
+
+    # колонка задания - его позиция в списке выше (array_position, с 1), баллы
+    # студента приходят парой массивов; задания, созданные после чтения списка, не попадут
+    assignment_ids = [assignment_id for assignment_id, _ in assignments]
+    graded = (
+        select(
+            Submission.student_id,
+            func.array_agg(
+                func.array_position(literal(assignment_ids, ARRAY(PG_UUID(as_uuid=True))), Submission.assignment_id)
+            ).label("positions"),
+            func.array_agg(Grade.score).label("scores")
+        )
+        .join(Grade, Grade.submission_id == Submission.id)
+        .where(Submission.assignment_id.in_(assignment_ids))
+        .group_by(Submission.student_id)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(course_students.c.student_id, graded.c.positions, graded.c.scores)
+        .outerjoin(graded, graded.c.student_id == course_students.c.student_id)
+        .where(course_students.c.course_id == course_id)
+        .order_by(course_students.c.student_id)
+    )).all()
+
+    width = len(assignments)
+    scores = [None] * (len(rows) * width)
+    for i, (_, student_positions, student_scores) in enumerate(rows):
+        if student_positions:
+            offset = i * width
+            for position, score in zip(student_positions, student_scores):
+                scores[offset + position - 1] = score
+
+    # без response_model: сотни тысяч ячеек не прогоняются через pydantic/jsonable_encoder
+    return JSONResponse(
+        {
+            "course_id": str(course_id),
+            "students": [str(student_id) for student_id, _, _ in rows],
+            "assignments": [str(assignment_id) for assignment_id in assignment_ids],
+            "max_scores": [max_score for _, max_score in assignments],
+            "scores": scores,
+        },
+        headers=dict(response.headers)
+    )
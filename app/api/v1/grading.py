@@ -1,38 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import csv
+from collections import Counter
+from typing import List, Literal, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db
 from app.models.user import User
 from app.models.submission import Submission, SubmissionStatus
 from app.models.grade import Grade
-from app.models.assignment import Assignment
-from app.models.course import Course
-from app.schemas.grade import GradeCreate, GradeUpdate, GradeResponse
+from app.schemas.grade import (
+    GradeCreate,
+    GradeUpdate,
+    GradeResponse,
+    BulkGradeRequest,
+    BulkGradeRow,
+    BulkGradeResponse
+)
+from app.utils.csv_stream import spool_csv, read_csv_batch
 from app.utils.dependencies import get_current_teacher
+from app.utils.export_stream import MEDIA_TYPES, encode_csv, encode_ndjson
+from app.utils.course_counters import bump_course_counters
+from app.utils.dashboard_cache import invalidate_dashboard
+from app.utils.grade_upsert import GradeInput, upsert_grades, invalidate_graded
+from app.utils.ownership import (
+    OwnedAssignment,
+    OwnedSubmission,
+    OwnedGrade,
+    get_owned_assignment,
+    get_owned_submission,
+    get_owned_grade
+)
 
 router = APIRouter(prefix="/grading", tags=["grading"])
 
+_IMPORT_HEADERS = {"email", "id", "student_id", "student"}
+_IMPORT_REPORT_COLUMNS = ["line", "student", "status", "submission_id", "error"]
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    course_id: UUID,
+    assignment_id: UUID,
+    teacher_id: UUID,
+    max_score: int,
+    rows: List[Tuple[int, List[str]]],
+    seen: set
+) -> List[dict]:
+    """Разобрать и применить пачку строк импорта; вернуть строки отчёта"""
+    report = []
+    parsed = []
+    for line, cells in rows:
+        value = cells[0].strip()
+        entry = {"line": line, "student": value, "status": "error", "submission_id": None, "error": None}
+        report.append(entry)
+        try:
+            score = int(cells[1].strip()) if len(cells) > 1 else None
+        except ValueError:
+            score = None
+        if score is None:
+            entry["error"] = "Expected student, score[, comment]"
+            continue
+        # вне диапазона upsert упал бы на DataError посреди уже начатого ответа
+        if not 0 <= score <= max_score:
+            entry["error"] = f"Score must be between 0 and max_score ({max_score})"
+            continue
+        try:
+            key = UUID(value)
+        except ValueError:
+            key = value
+        comment = cells[2].strip() if len(cells) > 2 and cells[2].strip() else None
+        parsed.append((entry, key, score, comment))
+
+    # студенты и их работы по заданию - одним IN-запросом на пачку
+    ids = list({key for _, key, _, _ in parsed if isinstance(key, UUID)})
+    emails = list({key for _, key, _, _ in parsed if not isinstance(key, UUID)})
+    submissions = {}
+    if parsed:
+        for submission_id, student_id, email in (await db.execute(
+            select(Submission.id, Submission.student_id, User.email)
+            .join(User, User.id == Submission.student_id)
+            .where(
+                Submission.assignment_id == assignment_id,
+                or_(Submission.student_id.in_(ids), User.email.in_(emails))
+            )
+        )).all():
+            submissions[student_id] = submission_id
+            submissions[email] = submission_id
+
+    grades = []
+    for entry, key, score, comment in parsed:
+        submission_id = submissions.get(key)
+        if submission_id is None:
+            entry["error"] = "No submission from this student"
+        elif submission_id in seen:
+            entry["error"] = "Duplicate student"
+        else:
+            seen.add(submission_id)
+            entry["submission_id"] = submission_id
+            grades.append(GradeInput(submission_id, score, comment))
+
+    result = await upsert_grades(db, course_id, assignment_id, teacher_id, grades)
+    await db.commit()
+    invalidate_graded(result)
+
+    for entry in report:
+        row = result.get(entry["submission_id"])
+        if row is not None:
+            entry["status"] = "graded" if row.inserted else "updated"
+        elif entry["error"] is None:
+            entry["submission_id"] = None
+            entry["error"] = "Submission not found"
+    return report
+
 
 @router.post("/submissions/{submission_id}/grade", response_model=GradeResponse)
-def grade_submission(
+async def grade_submission(
     submission_id: UUID,
     grade_data: GradeCreate,
+    owned: OwnedSubmission = Depends(get_owned_submission),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Выставить оценку за работу"""
-    submission = db.query(Submission).filter(Submission.id == submission_id).first()
-
-    if not submission:
-        raise HTTPException(status_code=404, detail="Submission not found")
-
-    # проверка прав
-    assignment = db.query(Assignment).filter(Assignment.id == submission.assignment_id).first()
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    assignment = owned.assignment
 
     if grade_data.score > assignment.max_score:
         raise HTTPException(
@@ -40,97 +135,211 @@ def grade_submission(
             detail=f"Score cannot exceed max_score ({assignment.max_score})"
         )
 
-    # есть ли уже оценка
-    existing_grade = db.query(Grade).filter(Grade.submission_id == submission_id).first()
-
-    if existing_grade:
-        # Обновляем существующую
-        existing_grade.score = grade_data.score
-        existing_grade.comment = grade_data.comment
-        db.commit()
-        db.refresh(existing_grade)
-        grade = existing_grade
-    else:
-        # Создаем новую
-        grade = Grade(
-            submission_id=submission_id,
-            teacher_id=current_user.id,
-            score=grade_data.score,
-            comment=grade_data.comment
-        )
-        db.add(grade)
-        db.commit()
-        db.refresh(grade)
+    # оценка, статус работы и строка для ответа - одним upsert с RETURNING, без refresh
+    result = await upsert_grades(
+        db, assignment.course_id, assignment.id, current_user.id,
+        [GradeInput(submission_id, grade_data.score, grade_data.comment)]
+    )
+    if submission_id not in result:
+        # работу удалили между проверкой прав и записью
+        raise HTTPException(status_code=404, detail="Submission not found")
+    await db.commit()
+    invalidate_graded(result)
 
-    # Обновляем статус submission
-    submission.status = SubmissionStatus.reviewed
-    db.commit()
+    return GradeResponse.model_validate(result[submission_id])
 
-    return grade
 
+@router.post("/assignments/{assignment_id}/grades/bulk", response_model=BulkGradeResponse)
+async def grade_submissions_bulk(
+    assignment_id: UUID,
+    payload: BulkGradeRequest,
+    owned: OwnedAssignment = Depends(get_owned_assignment),
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Выставить оценки сразу многим работам задания.
 
-@router.put("/grades/{grade_id}", response_model=GradeResponse)
-def update_grade(
-    grade_id: UUID,
-    grade_data: GradeUpdate,
+    Права и max_score проверяются один раз, все оценки пишутся одним
+    запросом в одной транзакции; ошибки возвращаются по строкам.
+    """
+    assignment = owned.assignment
+    if len(payload.grades) > settings.BULK_GRADE_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows (max {settings.BULK_GRADE_MAX_ROWS})")
+
+    errors = {}
+    accepted = {}
+    for i, item in enumerate(payload.grades):
+        if item.submission_id in accepted:
+            errors[i] = "Duplicate submission_id"
+        elif not 0 <= item.score <= assignment.max_score:
+            # строка с ошибкой не валит весь запрос, поэтому диапазон - здесь, а не в схеме
+            errors[i] = f"Score must be between 0 and max_score ({assignment.max_score})"
+        else:
+            accepted[item.submission_id] = GradeInput(item.submission_id, item.score, item.comment)
+
+    result = await upsert_grades(db, assignment.course_id, assignment.id, current_user.id, accepted.values())
+    await db.commit()
+    invalidate_graded(result)
+
+    rows = []
+    for i, item in enumerate(payload.grades):
+        row = result.get(item.submission_id) if i not in errors else None
+        if row is not None:
+            rows.append(BulkGradeRow(
+                submission_id=item.submission_id,
+                status="graded" if row.inserted else "updated",
+                grade_id=row.id
+            ))
+        else:
+            rows.append(BulkGradeRow(
+                submission_id=item.submission_id,
+                status="error",
+                error=errors.get(i, "Submission not found in this assignment")
+            ))
+
+    counts = Counter(row.status for row in rows)
+    return BulkGradeResponse(
+        graded=counts["graded"],
+        updated=counts["updated"],
+        errors=counts["error"],
+        rows=rows
+    )
+
+
+@router.post("/assignments/{assignment_id}/import")
+async def import_grades(
+    assignment_id: UUID,
+    request: Request,
+    report_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    owned: OwnedAssignment = Depends(get_owned_assignment),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Обновить оценку"""
-    grade = db.query(Grade).filter(Grade.id == grade_id).first()
+    """Импорт оценок из CSV (text/csv): студент (email или id), балл, комментарий.
+
+    Тело сохраняется на диск, затем разбирается пачками по
+    GRADE_IMPORT_CHUNK_SIZE строк: студенты ищутся одним IN-запросом на
+    пачку, оценки пишутся одним upsert и коммитятся. Отчёт по строкам
+    отдаётся потоком по мере обработки.
+    """
+    assignment = owned.assignment
+    course_id, max_score, teacher_id = assignment.course_id, assignment.max_score, current_user.id
+    # соединение не держим, пока читается тело
+    await db.rollback()
+    source = await spool_csv(request.stream(), settings.GRADE_IMPORT_MAX_BYTES)
+
+    def encode(report: List[dict]) -> bytes:
+        if report_format == "csv":
+            return encode_csv([entry[name] for name in _IMPORT_REPORT_COLUMNS] for entry in report)
+        return encode_ndjson(report)
+
+    async def body():
+        try:
+            if report_format == "csv":
+                yield encode_csv([_IMPORT_REPORT_COLUMNS])
+            reader = csv.reader(source)
+            seen = set()
+            while True:
+                try:
+                    batch = await run_in_threadpool(read_csv_batch, reader, settings.GRADE_IMPORT_CHUNK_SIZE)
+                except (UnicodeDecodeError, csv.Error) as e:
+                    yield encode([{
+                        "line": reader.line_num + 1, "student": None, "status": "error",
+                        "submission_id": None, "error": f"Malformed CSV: {e}"
+                    }])
+                    break
+                if not batch:
+                    break
+                if batch[0][0] == 1 and batch[0][1][0].strip().lower() in _IMPORT_HEADERS:
+                    batch = batch[1:]
+                yield encode(await _import_chunk(
+                    db, course_id, assignment_id, teacher_id, max_score, batch, seen
+                ))
+        finally:
+            source.close()
+
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[report_format])
 
-    if not grade:
+
+async def _lock_grade(db: AsyncSession, owned: OwnedGrade) -> Tuple[Grade, Submission]:
+    """Заблокировать (FOR UPDATE) и перечитать работу и оценку.
+
+    Дельты счётчиков считаются от прежнего балла и статуса: без блокировки
+    две параллельные правки одной оценки посчитали бы их от одного и того же
+    старого значения. Порядок - работа, затем оценка, как в upsert_grades.
+    """
+    submission = await db.scalar(
+        select(Submission)
+        .where(Submission.id == owned.submission.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    grade = await db.scalar(
+        select(Grade)
+        .where(Grade.id == owned.grade.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if submission is None or grade is None:
         raise HTTPException(status_code=404, detail="Grade not found")
+    return grade, submission
+
 
-    # Проверка прав (через submission -> assignment -> course)
-    submission = db.query(Submission).filter(Submission.id == grade.submission_id).first()
-    assignment = db.query(Assignment).filter(Assignment.id == submission.assignment_id).first()
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
+@router.put("/grades/{grade_id}", response_model=GradeResponse)
+async def update_grade(
+    grade_id: UUID,
+    grade_data: GradeUpdate,
+    owned: OwnedGrade = Depends(get_owned_grade),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Обновить оценку"""
+    assignment = owned.assignment
 
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    if grade_data.score is not None and grade_data.score > assignment.max_score:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Score cannot exceed max_score ({assignment.max_score})"
+        )
 
+    grade, _ = await _lock_grade(db, owned)
     if grade_data.score is not None:
-        if grade_data.score > assignment.max_score:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Score cannot exceed max_score ({assignment.max_score})"
-            )
+        await bump_course_counters(
+            db, assignment.course_id, grades_changed=True, score_sum=grade_data.score - grade.score
+        )
         grade.score = grade_data.score
 
     if grade_data.comment is not None:
         grade.comment = grade_data.comment
 
-    db.commit()
-    db.refresh(grade)
+    await db.commit()
+    await db.refresh(grade)
+    invalidate_dashboard(owned.submission.student_id)
 
     return grade
 
 
 @router.delete("/grades/{grade_id}")
-def delete_grade(
+async def delete_grade(
     grade_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    owned: OwnedGrade = Depends(get_owned_grade),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Удалить оценку"""
-    grade = db.query(Grade).filter(Grade.id == grade_id).first()
-
-    if not grade:
-        raise HTTPException(status_code=404, detail="Grade not found")
-
-    # Проверка прав
-    submission = db.query(Submission).filter(Submission.id == grade.submission_id).first()
-    assignment = db.query(Assignment).filter(Assignment.id == submission.assignment_id).first()
-    course = db.query(Course).filter(Course.id == assignment.course_id).first()
+    grade, submission = await _lock_grade(db, owned)
 
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    await bump_course_counters(
+        db, owned.assignment.course_id,
+        grades_changed=True,
+        graded=-1,
+        score_sum=-grade.score,
+        pending=0 if submission.status == SubmissionStatus.pending else 1
+    )
 
     # Обновляем статус submission обратно
     submission.status = SubmissionStatus.pending
 
-    db.delete(grade)
-    db.commit()
+    await db.delete(grade)
+    await db.commit()
+    invalidate_dashboard(submission.student_id)
 
     return {"message": "Grade deleted"}
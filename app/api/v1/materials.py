@@ -1,34 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.orm import undefer
 from typing import List
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.models.user import User
 from app.models.course import Course
 from app.models.material import Material
 from app.schemas.material import MaterialCreate, MaterialUpdate, MaterialResponse
 from app.utils.dependencies import get_current_teacher
+from app.utils.conditional import make_etag, conditional_response
+from app.utils.course_counters import bump_course_counters
+from app.utils.ownership import OwnedMaterial, get_owned_course, get_owned_material
+from app.utils.pagination import PageParams, keyset, page_rows
 
 router = APIRouter(prefix="/materials", tags=["materials"])
 
+NO_ORDER_NUMBER = 2 ** 31 - 1
+
 
 @router.post("/courses/{course_id}/materials", response_model=MaterialResponse)
-def create_material(
+async def create_material(
     course_id: UUID,
     material_data: MaterialCreate,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    course: Course = Depends(get_owned_course),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Создать учебный материал для курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
-
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
     material = Material(
         course_id=course_id,
         title=material_data.title,
@@ -38,20 +38,24 @@ def create_material(
     )
 
     db.add(material)
-    db.commit()
-    db.refresh(material)
+    await bump_course_counters(db, course_id, materials=1)
+    await db.commit()
+    # без refresh: он сбросил бы отложенный content, а умолчания уже заполнены при flush
 
     return material
 
 
 @router.get("/courses/{course_id}/materials", response_model=List[MaterialResponse])
-def get_course_materials(
+async def get_course_materials(
     course_id: UUID,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Получить все материалы курса"""
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -59,29 +63,41 @@ def get_course_materials(
     if course.teacher_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    materials = db.query(Material).filter(
-        Material.course_id == course_id
-    ).order_by(Material.order_number).all()
+    # версия списка - число строк и max(updated_at): дешёвый агрегат по индексу (course_id, order_number)
+    count, last_updated = (await db.execute(
+        select(func.count(Material.id), func.max(Material.updated_at))
+        .where(Material.course_id == course_id)
+    )).one()
+    etag = make_etag(course_id, count, last_updated, page.cursor, page.limit)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    # материалы без order_number - в конце списка: сравнение (NULL, id) > курсор
+    # никогда не истинно, и страницы после первого NULL терялись бы
+    order_key = func.coalesce(Material.order_number, NO_ORDER_NUMBER)
+    # список показывает текст материала, поэтому content грузим сразу
+    stmt = keyset(
+        select(Material).options(undefer(Material.content)).where(Material.course_id == course_id),
+        page, order_key, Material.id
+    )
+    materials = (await db.scalars(stmt)).all()
 
-    return materials
+    return page_rows(
+        materials, page, response,
+        key=lambda m: (NO_ORDER_NUMBER if m.order_number is None else m.order_number, m.id)
+    )
 
 
 @router.put("/{material_id}", response_model=MaterialResponse)
-def update_material(
+async def update_material(
     material_id: UUID,
     material_data: MaterialUpdate,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    owned: OwnedMaterial = Depends(get_owned_material),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Обновить материал"""
-    material = db.query(Material).filter(Material.id == material_id).first()
-
-    if not material:
-        raise HTTPException(status_code=404, detail="Material not found")
-
-    course = db.query(Course).filter(Course.id == material.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
+    material = owned.material
 
     # Обновляем поля
     if material_data.title:
@@ -93,29 +109,21 @@ def update_material(
     if material_data.order_number is not None:
         material.order_number = material_data.order_number
 
-    db.commit()
-    db.refresh(material)
+    await db.commit()
+    await db.refresh(material, ["content", "updated_at"])
 
     return material
 
 
 @router.delete("/{material_id}")
-def delete_material(
+async def delete_material(
     material_id: UUID,
-    current_user: User = Depends(get_current_teacher),
-    db: Session = Depends(get_db)
+    owned: OwnedMaterial = Depends(get_owned_material),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Удалить материал"""
-    material = db.query(Material).filter(Material.id == material_id).first()
-
-    if not material:
-        raise HTTPException(status_code=404, detail="Material not found")
-
-    course = db.query(Course).filter(Course.id == material.course_id).first()
-    if course.teacher_id != current_user.id and current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    db.delete(material)
-    db.commit()
+    await bump_course_counters(db, owned.material.course_id, materials=-1)
+    await db.delete(owned.material)
+    await db.commit()
 
     return {"message": "Material deleted"}
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+from uuid import UUID
+
+from app.database import get_async_read_db
+from app.models.user import User
+from app.models.course import Course
+from app.models.assignment import Assignment
+from app.models.submission import Submission
+from app.models.grade import Grade
+from app.schemas.assignment import SubmissionWithGrade
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/submissions", tags=["submissions"])
+
+
+@router.get("/{submission_id}", response_model=SubmissionWithGrade)
+async def get_submission(
+    submission_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Сданная работа целиком (content и файл) - для преподавателя курса или автора"""
+    row = (await db.execute(
+        select(Submission, User.full_name, Grade.score, Grade.comment, Course.teacher_id)
+        .options(undefer(Submission.content))
+        .join(User, User.id == Submission.student_id)
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(Course, Course.id == Assignment.course_id)
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(Submission.id == submission_id)
+    )).first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    submission, student_name, grade_score, grade_comment, teacher_id = row
+    if current_user.id not in (teacher_id, submission.student_id) and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return {
+        "id": submission.id,
+        "assignment_id": submission.assignment_id,
+        "student_id": submission.student_id,
+        "student_name": student_name,
+        "content": submission.content,
+        "file_url": submission.file_url,
+        "status": submission.status,
+        "submitted_at": submission.submitted_at,
+        "grade": grade_score,
+        "grade_comment": grade_comment
+    }
@@ -1,18 +1,348 @@
+import asyncio
+import time
+from typing import Optional
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.utils.db_metrics import TimedQueuePool, TimedAsyncQueuePool, instrument_engine, pool_status
+
+# cookie/заголовок, которые переключают чтения на primary после записи
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "x-read-primary"
+
+# ошибки подключения к реплике, после которых читаем с primary
+_REPLICA_ERRORS = (OperationalError, OSError, asyncio.TimeoutError)
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _create_engine(url: str, connect_timeout: Optional[int] = None):
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if connect_timeout:
+        connect_args["connect_timeout"] = connect_timeout
+
+    sync_engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        connect_args=connect_args,
+        **_pool_options()
+    )
+    instrument_engine(sync_engine)
+    return sync_engine
+
+
+def _async_database_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://..."""
+    if url.startswith("postgresql+asyncpg://"):
+        return url
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+
+def _create_async_engine(url: str, connect_timeout: Optional[int] = None):
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    if connect_timeout:
+        connect_args["timeout"] = connect_timeout
+
+    async_engine = create_async_engine(
+        _async_database_url(url),
+        poolclass=TimedAsyncQueuePool,
+        connect_args=connect_args,
+        **_pool_options()
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Движки и фабрики сессий создаются при первом обращении: импорт приложения,
+# моделей или alembic не трогает драйвер и не открывает соединений
+_state: dict = {}
+
+
+def get_engine():
+    if "engine" not in _state:
+        _state["engine"] = _create_engine(settings.DATABASE_URL)
+    return _state["engine"]
+
+
+def get_read_engine():
+    # без READ_DATABASE_URL чтения идут в primary
+    if "read_engine" not in _state:
+        _state["read_engine"] = (
+            _create_engine(settings.READ_DATABASE_URL, settings.READ_REPLICA_CONNECT_TIMEOUT)
+            if settings.READ_DATABASE_URL else get_engine()
+        )
+    return _state["read_engine"]
+
+
+def get_async_engine():
+    if not settings.DB_ASYNC:
+        return None
+    if "async_engine" not in _state:
+        _state["async_engine"] = _create_async_engine(settings.DATABASE_URL)
+    return _state["async_engine"]
+
+
+def get_async_read_engine():
+    if not settings.DB_ASYNC:
+        return None
+    if "async_read_engine" not in _state:
+        _state["async_read_engine"] = (
+            _create_async_engine(settings.READ_DATABASE_URL, settings.READ_REPLICA_CONNECT_TIMEOUT)
+            if settings.READ_DATABASE_URL else get_async_engine()
+        )
+    return _state["async_read_engine"]
+
+
+def _session_factory(name: str, bind_getter, async_: bool = False):
+    if name not in _state:
+        if async_:
+            _state[name] = async_sessionmaker(bind_getter(), autoflush=False, expire_on_commit=False)
+        else:
+            _state[name] = sessionmaker(autocommit=False, autoflush=False, bind=bind_getter())
+    return _state[name]
+
+
+def _sync_sessionmaker(read: bool = False):
+    if read:
+        return _session_factory("ReadSessionLocal", get_read_engine)
+    return _session_factory("SessionLocal", get_engine)
+
+
+def _async_sessionmaker(read: bool = False):
+    if read:
+        return _session_factory("AsyncReadSessionLocal", get_async_read_engine, async_=True)
+    return _session_factory("AsyncSessionLocal", get_async_engine, async_=True)
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "read_engine": get_read_engine,
+    "async_engine": get_async_engine,
+    "async_read_engine": get_async_read_engine,
+    "SessionLocal": lambda: _sync_sessionmaker(),
+    "ReadSessionLocal": lambda: _sync_sessionmaker(read=True),
+    "AsyncSessionLocal": lambda: _async_sessionmaker() if settings.DB_ASYNC else None,
+    "AsyncReadSessionLocal": lambda: _async_sessionmaker(read=True) if settings.DB_ASYNC else None,
+}
+
+
+def __getattr__(name: str):
+    """Ленивый доступ к engine/SessionLocal для скриптов (from app.database import SessionLocal)"""
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def has_read_replica() -> bool:
+    return bool(settings.READ_DATABASE_URL)
+
+
+def _replica_available() -> bool:
+    """Реплика настроена и не падала последние READ_REPLICA_RETRY_SECONDS"""
+    return has_read_replica() and time.monotonic() >= _state.get("replica_down_until", 0)
+
+
+def _mark_replica_down() -> None:
+    _state["replica_down_until"] = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+
+
+def pool_statuses() -> dict:
+    """Состояние пулов уже созданных движков (primary, реплика, async-варианты)"""
+    labels = {
+        "engine": "primary",
+        "read_engine": "replica",
+        "async_engine": "async_primary",
+        "async_read_engine": "async_replica",
+    }
+    pools = {}
+    seen = []
+    for key, label in labels.items():
+        engine = _state.get(key)
+        # без реплики read_engine - тот же объект, что и primary
+        if engine is None or any(engine is other for other in seen):
+            continue
+        seen.append(engine)
+        pools[label] = pool_status(getattr(engine, "sync_engine", engine))
+    return pools
+
+
+async def dispose_engines() -> None:
+    """Закрыть пулы соединений (при остановке приложения)"""
+    for key in ("async_read_engine", "async_engine"):
+        engine = _state.get(key)
+        if engine is not None:
+            await engine.dispose()
+    for key in ("read_engine", "engine"):
+        engine = _state.get(key)
+        if engine is not None:
+            engine.dispose()
+    _state.clear()
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    """Read-your-writes: после записи клиент читает с primary"""
+    return (
+        request.headers.get(READ_PRIMARY_HEADER) == "1"
+        or READ_PRIMARY_COOKIE in request.cookies
+    )
+
 
 # Dependency for db session
 def get_db():
-    db = SessionLocal()
+    db = _sync_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """Сессия для чтения: реплика, если настроена и доступна, иначе primary"""
+    if not _replica_available() or _pinned_to_primary(request):
+        yield from get_db()
+        return
+
+    db = _sync_sessionmaker(read=True)()
+    try:
+        db.connection()
+    except _REPLICA_ERRORS:
+        db.close()
+        _mark_replica_down()
+        yield from get_db()
+        return
+
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class _StreamedResult:
+    """Аналог AsyncResult.partitions для потокового чтения через SyncSessionAdapter"""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size: Optional[int] = None):
+        partitions = self._result.partitions(size)
+        try:
+            while True:
+                partition = await run_in_threadpool(next, partitions, None)
+                if partition is None:
+                    break
+                yield partition
+        finally:
+            self._result.close()
+
+
+class SyncSessionAdapter:
+    """Асинхронный интерфейс AsyncSession поверх синхронной сессии.
+
+    Используется при DB_ASYNC=False, чтобы async-роутеры работали и на
+    старом драйвере: каждый вызов уходит в threadpool.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def connection(self, **kwargs):
+        return await run_in_threadpool(self.sync_session.connection, **kwargs)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        # stream_results - серверный курсор psycopg2, строки не читаются в память разом
+        result = await run_in_threadpool(
+            self.sync_session.execute, statement.execution_options(stream_results=True), params, **kwargs
+        )
+        return _StreamedResult(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None):
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+def _new_async_session(read: bool = False):
+    if settings.DB_ASYNC:
+        return _async_sessionmaker(read)()
+    return SyncSessionAdapter(_sync_sessionmaker(read)(expire_on_commit=False))
+
+
+async def get_async_db():
+    """Async-сессия: asyncpg при DB_ASYNC=True, иначе sync-драйвер через threadpool"""
+    db = _new_async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_read_db(request: Request):
+    """Async-сессия для чтения с реплики (с откатом на primary)"""
+    db = None
+    if _replica_available() and not _pinned_to_primary(request):
+        db = _new_async_session(read=True)
+        try:
+            await db.connection()
+        except _REPLICA_ERRORS:
+            await db.close()
+            _mark_replica_down()
+            db = None
+
+    if db is None:
+        db = _new_async_session()
+
+    try:
+        yield db
+    finally:
+        await db.close()
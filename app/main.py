@@ -1,21 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, DataError
 from app.config import settings
-from app.database import engine, Base
+from app.database import pool_statuses, dispose_engines
+from app.middleware.route_context import RouteContextMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.utils.auth import HashingPoolBusy
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
-from app.api.v1 import auth, courses, assignments, materials, grading, analytics
-from app.api.admin import users, analytics as admin_analytics, mock_data
+from app.api.v1 import auth, courses, assignments, materials, grading, analytics, exports, submissions, files, gradebook
+from app.api.admin import users, analytics as admin_analytics, mock_data, metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Схема БД управляется миграциями (alembic upgrade head / python -m app.utils.init_db)"""
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        from app.utils.init_db import create_all
+        create_all()
+    yield
+    await dispose_engines()
 
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="LMS Backend API",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 
@@ -54,6 +69,16 @@ async def data_exception_handler(request: Request, exc: DataError):
     )
 
 
+@app.exception_handler(HashingPoolBusy)
+async def hashing_busy_exception_handler(request: Request, exc: HashingPoolBusy):
+    """Пул хеширования паролей перегружен"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy. Please retry later."},
+        headers={"Retry-After": str(settings.HASHING_RETRY_AFTER_SECONDS)}
+    )
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -61,21 +86,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Content-Range", "Accept-Ranges"],
 )
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RouteContextMiddleware)
 
 
 # routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(courses.router, prefix="/api/v1")
 app.include_router(assignments.router, prefix="/api/v1")
+app.include_router(submissions.router, prefix="/api/v1")
 app.include_router(materials.router, prefix="/api/v1")
 app.include_router(grading.router, prefix="/api/v1")
 app.include_router(analytics.router, prefix="/api/v1")
+app.include_router(exports.router, prefix="/api/v1")
+app.include_router(gradebook.router, prefix="/api/v1")
+app.include_router(files.router, prefix="/api/v1")
 
 # admin routers
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(admin_analytics.router, prefix="/api/v1")
 app.include_router(mock_data.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -90,5 +123,11 @@ def root():
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
+    """Health check endpoint (degraded, если пул соединений исчерпан)"""
+    pools = pool_statuses()
+    if any(pool["saturated"] for pool in pools.values()):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "degraded", "db_pool": pools}
+        )
+    return {"status": "ok", "db_pool": pools}
@@ -0,0 +1,30 @@
+from app.config import settings
+from app.database import READ_PRIMARY_COOKIE
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReadYourWritesMiddleware:
+    """После успешной записи ставит короткоживущую cookie, которая
+    направляет чтения этого клиента на primary, пока реплика догоняет"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+            f"Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
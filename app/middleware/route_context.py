@@ -0,0 +1,19 @@
+from app.utils.db_metrics import current_request_scope
+
+
+class RouteContextMiddleware:
+    """Кладёт ASGI scope запроса в contextvar, чтобы метрики пула знали роут"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
@@ -1,6 +1,8 @@
 from app.models.user import User, UserRole
 from app.models.admin_permission import AdminPermission
 from app.models.course import Course, course_students
+from app.models.course_counter import CourseCounter
+from app.models.course_file import CourseFile
 from app.models.material import Material
 from app.models.assignment import Assignment
 from app.models.submission import Submission, SubmissionStatus
@@ -14,6 +16,8 @@ __all__ = [
     "AdminPermission",
     "Course",
     "course_students",
+    "CourseCounter",
+    "CourseFile",
     "Material",
     "Assignment",
     "Submission",
@@ -5,6 +5,34 @@ import uuid
 from app.database import Base
 
 
+# порядок флагов задаёт биты маски прав в JWT - не переставлять
+PERMISSION_FLAGS = (
+    "can_manage_users",
+    "can_manage_courses",
+    "can_manage_tests",
+    "can_view_analytics",
+    "can_manage_permissions",
+)
+
+
+def permissions_to_bitmask(perms) -> int:
+    """Упаковать права админа в битовую маску"""
+    if perms is None:
+        return 0
+    mask = 0
+    for bit, flag in enumerate(PERMISSION_FLAGS):
+        if getattr(perms, flag, False):
+            mask |= 1 << bit
+    return mask
+
+
+def has_permission(mask: int, permission: str) -> bool:
+    """Проверить право по битовой маске"""
+    if permission not in PERMISSION_FLAGS:
+        return False
+    return bool(mask & (1 << PERMISSION_FLAGS.index(permission)))
+
+
 class AdminPermission(Base):
     __tablename__ = "admin_permissions"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Table, PrimaryKeyConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -9,9 +9,11 @@ from app.database import Base
 course_students = Table(
     'course_students',
     Base.metadata,
-    Column('course_id', UUID(as_uuid=True), ForeignKey('courses.id', ondelete="CASCADE")),
-    Column('student_id', UUID(as_uuid=True), ForeignKey('users.id', ondelete="CASCADE")),
-    Column('enrolled_at', DateTime, default=datetime.utcnow)
+    Column('course_id', UUID(as_uuid=True), ForeignKey('courses.id', ondelete="CASCADE"), nullable=False),
+    Column('student_id', UUID(as_uuid=True), ForeignKey('users.id', ondelete="CASCADE"), nullable=False),
+    Column('enrolled_at', DateTime, default=datetime.utcnow),
+    PrimaryKeyConstraint('course_id', 'student_id', name='pk_course_students'),
+    Index('ix_course_students_student_id', 'student_id')
 )
 
 
@@ -21,7 +23,7 @@ class Course(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    teacher_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    teacher_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     is_published = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.database import Base
+
+
+class CourseCounter(Base):
+    """Счётчики курса, которые ведут пути записи (см. app/utils/course_counters.py)"""
+    __tablename__ = "course_counters"
+
+    course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    students = Column(Integer, nullable=False, default=0, server_default="0", index=True)
+    assignments = Column(Integer, nullable=False, default=0, server_default="0")
+    materials = Column(Integer, nullable=False, default=0, server_default="0")
+    submissions = Column(Integer, nullable=False, default=0, server_default="0")
+    pending = Column(Integer, nullable=False, default=0, server_default="0")  # работы на проверке
+    graded = Column(Integer, nullable=False, default=0, server_default="0")
+    score_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    grades_updated_at = Column(DateTime, nullable=True)  # последнее изменение оценок курса - версия журнала
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
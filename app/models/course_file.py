@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, BigInteger, PrimaryKeyConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.database import Base
+
+
+class CourseFile(Base):
+    """Файл в хранилище курса; содержимое лежит на диске по sha256 (см. app/utils/file_store.py)"""
+    __tablename__ = "course_files"
+    __table_args__ = (
+        PrimaryKeyConstraint("course_id", "sha256", name="pk_course_files"),
+        Index("ix_course_files_sha256", "sha256"),  # сборка мусора: есть ли ссылки на blob
+    )
+
+    course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import uuid
 from app.database import Base
@@ -7,11 +8,14 @@ from app.database import Base
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        Index("ix_materials_course_order", "course_id", "order_number"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
+    content = deferred(Column(Text, nullable=True))  # грузится по запросу: undefer(Material.content)
     file_url = Column(String, nullable=True)  # URL к файлу (если есть)
     order_number = Column(Integer, default=0)  # порядок в курсе
     created_at = Column(DateTime, default=datetime.utcnow)
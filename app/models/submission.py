@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import uuid
 import enum
@@ -14,11 +15,17 @@ class SubmissionStatus(str, enum.Enum):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("uq_submissions_assignment_student", "assignment_id", "student_id", unique=True),
+        # списки работ задания: keyset по (submitted_at, id), с фильтром по статусу и без
+        Index("ix_submissions_assignment_submitted", "assignment_id", "submitted_at", "id"),
+        Index("ix_submissions_assignment_status", "assignment_id", "status", "submitted_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     assignment_id = Column(UUID(as_uuid=True), ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
-    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    content = Column(Text, nullable=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    content = deferred(Column(Text, nullable=True))  # грузится по запросу: undefer(Submission.content)
     file_url = Column(String, nullable=True)
     status = Column(Enum(SubmissionStatus), default=SubmissionStatus.pending)
     submitted_at = Column(DateTime, default=datetime.utcnow)
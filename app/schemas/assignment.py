@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -64,3 +64,45 @@ class SubmissionWithGrade(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SubmissionListItem(BaseModel):
+    """Строка списка работ: без полного content, он - в GET /submissions/{id}"""
+    id: UUID
+    assignment_id: UUID
+    student_id: UUID
+    student_name: str
+    status: str
+    submitted_at: datetime
+    grade: Optional[int] = None
+    grade_comment: Optional[str] = None
+    content_length: int = 0  # байт
+    content_preview: Optional[str] = None
+    has_file: bool = False
+
+
+# Дашборд студента
+class DashboardCourse(BaseModel):
+    id: UUID
+    title: str
+
+
+class DashboardAssignment(BaseModel):
+    assignment_id: UUID
+    title: str
+    description: Optional[str]
+    max_score: int
+    deadline: Optional[datetime]
+    course_id: UUID
+    course_title: str
+    submission_id: Optional[UUID] = None
+    status: str  # not_submitted / pending / reviewed / rejected
+    submitted_at: Optional[datetime] = None
+    grade: Optional[int] = None
+    grade_comment: Optional[str] = None
+
+
+class StudentDashboardResponse(BaseModel):
+    courses: List[DashboardCourse]  # курсы заданий этой страницы
+    assignments: List[DashboardAssignment]
+    upcoming: List[DashboardAssignment]  # несданные с дедлайном в будущем
@@ -25,11 +25,20 @@ class UserLogin(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+
 class TokenData(BaseModel):
+    user_id: Optional[UUID] = None
     email: Optional[str] = None
+    role: Optional[str] = None
+    perms: int = 0
+    ver: int = 0
 
 
 class UserResponse(BaseModel):
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -28,6 +28,14 @@ class CourseResponse(BaseModel):
         from_attributes = True
 
 
+class CourseListResponse(CourseResponse):
+    # заполняются при ?include_counts=true
+    students_count: Optional[int] = None
+    assignments_count: Optional[int] = None
+    materials_count: Optional[int] = None
+    pending_submissions: Optional[int] = None
+
+
 class CourseDetailResponse(BaseModel):
     id: UUID
     title: str
@@ -37,6 +45,8 @@ class CourseDetailResponse(BaseModel):
     created_at: datetime
     students_count: int = 0
     assignments_count: int = 0
+    materials_count: int = 0
+    pending_submissions: int = 0
 
     class Config:
         from_attributes = True
@@ -53,3 +63,21 @@ class CourseAdminResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Массовая запись на курс
+class BulkEnrollRequest(BaseModel):
+    students: List[str]  # email или UUID студента
+
+
+class BulkEnrollRow(BaseModel):
+    value: str
+    status: str  # enrolled / already_enrolled / not_found
+    student_id: Optional[UUID] = None
+
+
+class BulkEnrollResponse(BaseModel):
+    enrolled: int
+    already_enrolled: int
+    not_found: int
+    rows: List[BulkEnrollRow]
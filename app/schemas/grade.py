@@ -1,16 +1,16 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
 
 class GradeCreate(BaseModel):
-    score: int
+    score: int = Field(ge=0)
     comment: Optional[str] = None
 
 
 class GradeUpdate(BaseModel):
-    score: Optional[int] = None
+    score: Optional[int] = Field(default=None, ge=0)
     comment: Optional[str] = None
 
 
@@ -25,3 +25,37 @@ class GradeResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Массовое выставление оценок
+class BulkGradeItem(BaseModel):
+    submission_id: UUID
+    score: int
+    comment: Optional[str] = None
+
+
+class BulkGradeRequest(BaseModel):
+    grades: List[BulkGradeItem]
+
+
+class BulkGradeRow(BaseModel):
+    submission_id: UUID
+    status: str  # graded / updated / error
+    grade_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class BulkGradeResponse(BaseModel):
+    graded: int
+    updated: int
+    errors: int
+    rows: List[BulkGradeRow]
+
+
+# Журнал оценок курса в колоночном виде
+class GradebookMatrix(BaseModel):
+    course_id: UUID
+    students: List[UUID]
+    assignments: List[UUID]
+    max_scores: List[int]
+    scores: List[Optional[int]]  # построчно: scores[i * len(assignments) + j] - студент i, задание j
@@ -1,10 +1,32 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+
+class HashingPoolBusy(Exception):
+    """Очередь на хеширование переполнена"""
+    pass
+
+
+# bcrypt отпускает GIL, поэтому пула потоков достаточно
+_hashing_pool = ThreadPoolExecutor(
+    max_workers=settings.HASHING_POOL_SIZE or os.cpu_count() or 1,
+    thread_name_prefix="bcrypt"
+)
+_hashing_pending = 0
+_hashing_lock = threading.Lock()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -17,6 +39,38 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_in_hashing_pool(func, *args):
+    global _hashing_pending
+    with _hashing_lock:
+        if _hashing_pending >= settings.HASHING_QUEUE_LIMIT:
+            raise HashingPoolBusy()
+        _hashing_pending += 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hashing_pool, func, *args)
+    finally:
+        with _hashing_lock:
+            _hashing_pending -= 1
+
+
+async def verify_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Проверка пароля в пуле хеширования.
+
+    Возвращает (валиден ли пароль, новый хеш или None). Новый хеш появляется,
+    если сохранённый был посчитан с устаревшей стоимостью bcrypt.
+    """
+    return await _run_in_hashing_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Хеширование пароля в пуле хеширования"""
+    return await _run_in_hashing_pool(pwd_context.hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Создание JWT токена"""
     to_encode = data.copy()
@@ -30,10 +84,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def decode_access_token(token: str):
+def create_user_tokens(user, permissions_mask: int = 0) -> dict:
+    """Пара access/refresh токенов с claims для проверки прав без БД"""
+    access_token = create_access_token(data={
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "perms": permissions_mask,
+        "ver": user.token_version or 0,
+        "type": "access",
+    })
+    refresh_token = create_access_token(
+        data={
+            "sub": str(user.id),
+            "ver": user.token_version or 0,
+            "type": "refresh",
+        },
+        expires_delta=timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+def create_download_token(course_id, sha256: str) -> str:
+    """Короткоживущая подпись ссылки на один файл курса (для <a href> без заголовка Authorization)"""
+    return create_access_token(
+        data={"course": str(course_id), "sha": sha256, "type": "download"},
+        expires_delta=timedelta(seconds=settings.DOWNLOAD_LINK_EXPIRE_SECONDS)
+    )
+
+
+def decode_access_token(token: str, token_type: str = "access"):
     """Декодирование JWT токена"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    if payload.get("type") != token_type:
+        return None
+    return payload
@@ -0,0 +1,102 @@
+"""
+Бенчмарк массовой записи на курс: POST /courses/{id}/students/bulk на 10k строк
+против поштучного POST /courses/{id}/students.
+
+    python -m app.utils.bench_bulk_enroll --url http://localhost:8000 --rows 10000
+
+Студенты bulk_<i>@example.com создаются напрямую в БД (DATABASE_URL).
+Требует httpx (pip install httpx) и преподавателя из seed_data.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+SEED_STUDENTS_SQL = """
+INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+SELECT gen_random_uuid(), 'bulk_' || i || '@example.com', 'x', 'Bulk Student ' || i,
+       'student'::userrole, true, false, 0, now()
+FROM generate_series(1, :rows) AS i
+ON CONFLICT (email) DO NOTHING
+"""
+
+
+def seed_students(rows: int) -> list:
+    db = SessionLocal()
+    try:
+        db.execute(text(SEED_STUDENTS_SQL), {"rows": rows})
+        db.commit()
+    finally:
+        db.close()
+    return [f"bulk_{i}@example.com" for i in range(1, rows + 1)]
+
+
+async def run_benchmark(url: str, rows: int, single_sample: int, email: str, password: str):
+    emails = seed_students(rows)
+    csv_body = ("email\n" + "\n".join(emails) + "\n").encode()
+
+    async with httpx.AsyncClient(base_url=url, timeout=300) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        async def new_course() -> str:
+            r = await client.post("/api/v1/courses/", json={"title": "Bulk enroll benchmark"}, headers=headers)
+            r.raise_for_status()
+            return r.json()["id"]
+
+        course_id = await new_course()
+        for label in ("bulk csv (new)", "bulk csv (repeat)"):
+            started = time.perf_counter()
+            r = await client.post(
+                f"/api/v1/courses/{course_id}/students/bulk",
+                content=csv_body,
+                headers={**headers, "Content-Type": "text/csv"}
+            )
+            r.raise_for_status()
+            elapsed = time.perf_counter() - started
+            result = r.json()
+            print(f"{label}: {rows} rows in {elapsed:.2f}s -> {rows / elapsed:.0f} rows/s "
+                  f"(enrolled {result['enrolled']}, already {result['already_enrolled']}, "
+                  f"not found {result['not_found']})")
+
+        # поштучно - на выборке, с экстраполяцией на rows
+        course_id = await new_course()
+        started = time.perf_counter()
+        for student_email in emails[:single_sample]:
+            r = await client.post(
+                f"/api/v1/courses/{course_id}/students",
+                json={"email": student_email},
+                headers=headers
+            )
+            r.raise_for_status()
+        elapsed = time.perf_counter() - started
+        rate = single_sample / elapsed
+        print(f"one by one: {single_sample} rows in {elapsed:.2f}s -> {rate:.0f} rows/s "
+              f"(~{rows / rate:.0f}s for {rows})")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--single-sample", type=int, default=200)
+    parser.add_argument("--email", default="teacher@test.com")
+    parser.add_argument("--password", default="teacher123")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.rows, args.single_sample, args.email, args.password))
@@ -0,0 +1,77 @@
+"""
+Бенчмарк условных GET: полный ответ против 304 по If-None-Match.
+
+    python -m app.utils.bench_conditional --url http://localhost:8000 --course-id <id>
+
+Требует httpx (pip install httpx) и тестовые данные из seed_data.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+async def measure(client, endpoint: str, headers: dict, requests: int):
+    latencies = []
+    body_bytes = 0
+    status = None
+    for _ in range(requests):
+        started = time.perf_counter()
+        r = await client.get(endpoint, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        body_bytes += len(r.content)
+        status = r.status_code
+
+    latencies.sort()
+    return status, body_bytes / requests, latencies[len(latencies) // 2] * 1000
+
+
+async def run_benchmark(url: str, course_id: str, requests: int, email: str, password: str):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        if course_id is None:
+            r = await client.get("/api/v1/courses/", headers=auth)
+            r.raise_for_status()
+            course_id = r.json()[0]["id"]
+
+        endpoints = [
+            f"/api/v1/courses/{course_id}",
+            f"/api/v1/materials/courses/{course_id}/materials",
+            f"/api/v1/assignments/courses/{course_id}/assignments",
+        ]
+        for endpoint in endpoints:
+            r = await client.get(endpoint, headers=auth)
+            r.raise_for_status()
+            etag = r.headers["etag"]
+
+            full = await measure(client, endpoint, auth, requests)
+            cached = await measure(client, endpoint, {**auth, "If-None-Match": etag}, requests)
+            print(endpoint)
+            print(f"  full: {full[0]}, {full[1]:.0f} B/response, p50 {full[2]:.2f} ms")
+            print(f"  etag: {cached[0]}, {cached[1]:.0f} B/response, p50 {cached[2]:.2f} ms")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--course-id", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--email", default="teacher@test.com")
+    parser.add_argument("--password", default="teacher123")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.course_id, args.requests, args.email, args.password))
@@ -0,0 +1,105 @@
+"""
+Бенчмарк статистики курса: чтение строки course_counters против живого
+подсчёта по исходным таблицам (пять запросов, как считалась статистика до
+счётчиков), плюс GET /analytics/courses/{id}/stats и повтор с If-None-Match.
+
+    python -m app.utils.bench_course_stats --url http://localhost:8000 --students 2000 --assignments 200
+
+Данные создаются как в bench_gradebook (DATABASE_URL, SECRET_KEY должен
+совпадать с сервером). Заодно сверяет, что счётчики совпадают с живым
+подсчётом. Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.utils.bench_grading import seed_teachers, seed, percentile
+from app.utils.bench_gradebook import grade, measure
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+LIVE_SQL = {
+    "students": "SELECT count(*) FROM course_students WHERE course_id = :course_id",
+    "assignments": "SELECT count(*) FROM assignments WHERE course_id = :course_id",
+    "submissions": """
+        SELECT count(*) FROM submissions s JOIN assignments a ON a.id = s.assignment_id
+        WHERE a.course_id = :course_id
+    """,
+    "graded": """
+        SELECT count(*) FROM grades g
+        JOIN submissions s ON s.id = g.submission_id
+        JOIN assignments a ON a.id = s.assignment_id
+        WHERE a.course_id = :course_id
+    """,
+    "score_sum": """
+        SELECT coalesce(sum(g.score), 0) FROM grades g
+        JOIN submissions s ON s.id = g.submission_id
+        JOIN assignments a ON a.id = s.assignment_id
+        WHERE a.course_id = :course_id
+    """,
+}
+
+COUNTERS_SQL = """
+SELECT students, assignments, submissions, graded, score_sum
+FROM course_counters WHERE course_id = :course_id
+"""
+
+
+def time_queries(course_id, runs: int):
+    db = SessionLocal()
+    try:
+        params = {"course_id": course_id}
+        live_latencies, counter_latencies = [], []
+        for _ in range(runs):
+            started = time.perf_counter()
+            live = {name: db.execute(text(sql), params).scalar() for name, sql in LIVE_SQL.items()}
+            live_latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            counters = dict(db.execute(text(COUNTERS_SQL), params).mappings().one())
+            counter_latencies.append(time.perf_counter() - started)
+        db.rollback()
+    finally:
+        db.close()
+
+    print(f"live query: p50 {percentile(live_latencies, 0.5):.2f} ms, p95 {percentile(live_latencies, 0.95):.2f} ms")
+    print(f"course_counters: p50 {percentile(counter_latencies, 0.5):.2f} ms, "
+          f"p95 {percentile(counter_latencies, 0.95):.2f} ms")
+    drift = {name: (counters[name], live[name]) for name in live if counters[name] != live[name]}
+    print(f"counters {'drift: ' + str(drift) if drift else 'match the live query'}")
+
+
+async def run_benchmark(url: str, students: int, assignments: int, runs: int):
+    [teacher_id] = seed_teachers(students, 1)
+    headers, plan = seed(teacher_id, students, assignments)
+    course_id = grade(teacher_id, plan, 0.8)
+
+    time_queries(course_id, runs)
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        path = f"/api/v1/analytics/courses/{course_id}/stats"
+        r = await measure(client, path, headers, runs, "GET .../stats")
+        print(f"  {r.json()}")
+        await measure(client, path, {**headers, "If-None-Match": r.headers["etag"]}, runs, "if-none-match")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--assignments", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.students, args.assignments, args.runs))
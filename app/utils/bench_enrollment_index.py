@@ -0,0 +1,96 @@
+"""
+Микробенчмарк проверки записи на курс: индекс в памяти против запроса к БД.
+
+    python -m app.utils.bench_enrollment_index                 # только индекс
+    python -m app.utils.bench_enrollment_index --db            # + запрос к course_students
+
+Индекс заполняется синтетическими 100k записями; для --db нужна база с
+записями на курсы (например, python -m app.utils.seed_data).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import select
+from app.database import get_async_db
+from app.models.course import course_students
+from app.utils.enrollment_index import EnrollmentIndex
+
+
+def _synthetic_rows(enrollments: int, courses: int):
+    course_ids = [uuid.uuid4() for _ in range(courses)]
+    student_ids = [uuid.uuid4() for _ in range(enrollments // 4)]
+    rows = set()
+    while len(rows) < enrollments:
+        rows.add((random.choice(course_ids), random.choice(student_ids)))
+    return list(rows)
+
+
+async def bench_index(rows, lookups: int):
+    index = EnrollmentIndex(max_size=len(rows) * 2, ttl=3600)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.build(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sample = random.choices(rows, k=lookups)
+    started = time.perf_counter()
+    for course_id, student_id in sample:
+        assert await index.contains(course_id, student_id)
+    elapsed = time.perf_counter() - started
+
+    print(f"index: {len(rows)} enrollments, build {build_ms:.0f} ms, ~{memory / 1024 / 1024:.1f} MiB")
+    print(f"index: {lookups} lookups, {elapsed / lookups * 1e6:.2f} us/lookup")
+
+
+async def bench_query(lookups: int):
+    db_gen = get_async_db()
+    db = await db_gen.__anext__()
+    try:
+        rows = (await db.execute(
+            select(course_students.c.course_id, course_students.c.student_id).limit(10000)
+        )).all()
+        if not rows:
+            print("query: no enrollments in database, skipped")
+            return
+
+        sample = random.choices(rows, k=lookups)
+        started = time.perf_counter()
+        for course_id, student_id in sample:
+            enrolled = (await db.execute(
+                select(course_students).where(
+                    course_students.c.course_id == course_id,
+                    course_students.c.student_id == student_id
+                )
+            )).first()
+            assert enrolled
+        elapsed = time.perf_counter() - started
+        print(f"query: {lookups} lookups, {elapsed / lookups * 1e6:.2f} us/lookup")
+    finally:
+        await db_gen.aclose()
+
+
+async def main(args):
+    rows = _synthetic_rows(args.enrollments, args.courses)
+    await bench_index(rows, args.lookups)
+    if args.db:
+        await bench_query(min(args.lookups, 2000))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--enrollments", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=2_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--db", action="store_true")
+    asyncio.run(main(parser.parse_args()))
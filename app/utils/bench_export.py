@@ -0,0 +1,153 @@
+"""
+Бенчмарк потокового экспорта: выгрузка работ и ведомости курса на 500k работ
+с замером пикового RSS процесса сервера.
+
+    python -m app.utils.bench_export --url http://localhost:8000 --pid <pid uvicorn> \\
+        --students 2500 --assignments 200
+
+Курс, студенты, задания, работы (с content ~1 KB) и оценки создаются напрямую
+в БД (DATABASE_URL); --course-id - использовать уже засеянный курс. RSS
+читается из /proc/<pid>/status, поэтому сервер должен работать на этой же
+машине одним воркером. Токен подписывается локально - SECRET_KEY должен
+совпадать с сервером. Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.utils.auth import create_user_tokens
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+    SELECT gen_random_uuid(), 'export_' || i || '@example.com', 'x', 'Export Student ' || i,
+           'student'::userrole, true, false, 0, now()
+    FROM generate_series(1, :students) AS i
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO courses (id, title, teacher_id, is_published, created_at, updated_at)
+    VALUES (:course_id, 'Export benchmark', :teacher_id, true, now(), now())
+    """,
+    """
+    INSERT INTO assignments (id, course_id, title, max_score, created_at, updated_at)
+    SELECT gen_random_uuid(), :course_id, 'Assignment ' || i, 100, now() + i * interval '1 second', now()
+    FROM generate_series(1, :assignments) AS i
+    """,
+    """
+    INSERT INTO course_students (course_id, student_id, enrolled_at)
+    SELECT :course_id, id, now() FROM users WHERE email LIKE 'export\\_%@example.com'
+    """,
+    """
+    INSERT INTO submissions (id, assignment_id, student_id, content, status, submitted_at, updated_at)
+    SELECT gen_random_uuid(), a.id, cs.student_id, repeat('answer ', 150),
+           (CASE WHEN random() < 0.7 THEN 'reviewed' ELSE 'pending' END)::submissionstatus, now(), now()
+    FROM assignments a JOIN course_students cs ON cs.course_id = a.course_id
+    WHERE a.course_id = :course_id
+    """,
+    """
+    INSERT INTO grades (id, submission_id, teacher_id, score, comment, graded_at, updated_at)
+    SELECT gen_random_uuid(), s.id, :teacher_id, (random() * 100)::int, 'ok', now(), now()
+    FROM submissions s JOIN assignments a ON a.id = s.assignment_id
+    WHERE a.course_id = :course_id AND s.status = 'reviewed'
+    """,
+]
+
+
+def seed(students: int, assignments: int):
+    db = SessionLocal()
+    try:
+        teacher_id = db.execute(text("SELECT id FROM users WHERE role = 'teacher' LIMIT 1")).scalar()
+        if teacher_id is None:
+            sys.exit("No teacher found: run python -m app.utils.seed_data first")
+        course_id = uuid.uuid4()
+        params = {"students": students, "assignments": assignments, "course_id": course_id, "teacher_id": teacher_id}
+        for statement in SEED_SQL:
+            db.execute(text(statement), params)
+        db.commit()
+    finally:
+        db.close()
+    return course_id, teacher_id
+
+
+def course_teacher(course_id):
+    db = SessionLocal()
+    try:
+        return db.execute(text("SELECT teacher_id FROM courses WHERE id = :id"), {"id": course_id}).scalar()
+    finally:
+        db.close()
+
+
+def rss_kb(pid: int, field: str = "VmRSS") -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+async def measure(client, endpoint: str, headers: dict, pid: int):
+    rss_before = rss_kb(pid)
+    peak = rss_before
+    total = 0
+    started = time.perf_counter()
+    async with client.stream("GET", endpoint, headers=headers) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_bytes():
+            total += len(chunk)
+            peak = max(peak, rss_kb(pid))
+    elapsed = time.perf_counter() - started
+    return total, elapsed, rss_before, peak
+
+
+async def run_benchmark(url: str, pid: int, course_id, students: int, assignments: int):
+    if course_id is None:
+        course_id, teacher_id = seed(students, assignments)
+    else:
+        teacher_id = course_teacher(course_id)
+
+    token = create_user_tokens(User(id=teacher_id, email="teacher", role=UserRole.teacher, token_version=0))
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    endpoints = [
+        f"/api/v1/courses/{course_id}/export/submissions?format=csv",
+        f"/api/v1/courses/{course_id}/export/submissions?format=ndjson",
+        f"/api/v1/courses/{course_id}/export/submissions?format=csv&columns=submission_id,student_id,content",
+        f"/api/v1/courses/{course_id}/export/gradebook?format=csv",
+    ]
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        for endpoint in endpoints:
+            total, elapsed, rss_before, peak = await measure(client, endpoint, headers, pid)
+            print(endpoint)
+            print(f"  {total / 1024 / 1024:.1f} MB in {elapsed:.2f}s -> {total / 1024 / 1024 / elapsed:.1f} MB/s")
+            print(f"  server RSS {rss_before / 1024:.1f} MB -> peak {peak / 1024:.1f} MB "
+                  f"(+{(peak - rss_before) / 1024:.1f} MB)")
+    print(f"server VmHWM: {rss_kb(pid, 'VmHWM') / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pid", type=int, required=True, help="PID процесса uvicorn")
+    parser.add_argument("--course-id", type=uuid.UUID, default=None)
+    parser.add_argument("--students", type=int, default=2500)
+    parser.add_argument("--assignments", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.pid, args.course_id, args.students, args.assignments))
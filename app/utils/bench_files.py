@@ -0,0 +1,135 @@
+"""
+Бенчмарк файлового хранилища: потоковая загрузка 1 GB, повторная загрузка
+того же файла (дедупликация), скачивание целиком и по Range - с замером
+пикового RSS процесса сервера.
+
+    python -m app.utils.bench_files --url http://localhost:8000 --pid <pid uvicorn> --size-mb 1024
+
+Тело генерируется на лету, клиент тоже не держит файл в памяти. Курс
+берётся первый из курсов преподавателя (seed_data); квота курса
+(COURSE_STORAGE_QUOTA_BYTES) должна вмещать --size-mb.
+Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import hashlib
+import asyncio
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils.bench_export import rss_kb
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+BLOCK = 1024 * 1024
+
+
+async def multipart_body(boundary: str, size_mb: int, seed: bytes):
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="bench.bin"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    # содержимое зависит только от seed: повторная загрузка даёт тот же sha256
+    block = hashlib.sha256(seed).digest() * (BLOCK // 32)
+    for i in range(size_mb):
+        yield i.to_bytes(8, "big") + block[8:]
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+class RssSampler:
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.before = rss_kb(pid)
+        self.peak = self.before
+        self._task = None
+
+    async def _run(self):
+        while True:
+            self.peak = max(self.peak, rss_kb(self.pid))
+            await asyncio.sleep(0.05)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        self.peak = max(self.peak, rss_kb(self.pid))
+
+    def report(self) -> str:
+        return f"server RSS {self.before / 1024:.1f} MB -> peak {self.peak / 1024:.1f} MB " \
+               f"(+{(self.peak - self.before) / 1024:.1f} MB)"
+
+
+async def upload(client, course_id: str, headers: dict, size_mb: int, seed: bytes, pid: int, label: str) -> dict:
+    boundary = uuid.uuid4().hex
+    async with RssSampler(pid) as rss:
+        started = time.perf_counter()
+        r = await client.post(
+            f"/api/v1/files/courses/{course_id}",
+            content=multipart_body(boundary, size_mb, seed),
+            headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+        r.raise_for_status()
+        elapsed = time.perf_counter() - started
+    print(f"{label}: {size_mb} MB in {elapsed:.2f}s -> {size_mb / elapsed:.0f} MB/s; {rss.report()}")
+    return r.json()
+
+
+async def download(client, url: str, headers: dict, pid: int, label: str):
+    total = 0
+    async with RssSampler(pid) as rss:
+        started = time.perf_counter()
+        async with client.stream("GET", url, headers=headers) as r:
+            r.raise_for_status()
+            async for chunk in r.aiter_bytes():
+                total += len(chunk)
+        elapsed = time.perf_counter() - started
+    mb = total / 1024 / 1024
+    print(f"{label}: {r.status_code}, {mb:.1f} MB in {elapsed:.2f}s -> {mb / elapsed:.0f} MB/s; {rss.report()}")
+    return r
+
+
+async def run_benchmark(url: str, pid: int, size_mb: int, email: str, password: str):
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        r = await client.get("/api/v1/courses/", headers=auth)
+        r.raise_for_status()
+        course_id = r.json()[0]["id"]
+
+        seed = uuid.uuid4().bytes
+        stored = await upload(client, course_id, auth, size_mb, seed, pid, "upload")
+        await upload(client, course_id, auth, size_mb, seed, pid, "upload (duplicate)")
+
+        full = await download(client, stored["url"], auth, pid, "download")
+        await download(client, stored["url"], {**auth, "Range": "bytes=0-1048575"}, pid, "range 1 MB")
+        await download(client, stored["url"], {**auth, "If-None-Match": full.headers["etag"]}, pid, "if-none-match")
+
+        r = await client.get(f"/api/v1/files/courses/{course_id}/usage", headers=auth)
+        print(f"course storage: {r.json()}")
+    print(f"server VmHWM: {rss_kb(pid, 'VmHWM') / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pid", type=int, required=True, help="PID процесса uvicorn")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--email", default="teacher@test.com")
+    parser.add_argument("--password", default="teacher123")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.pid, args.size_mb, args.email, args.password))
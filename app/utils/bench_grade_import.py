@@ -0,0 +1,89 @@
+"""
+Бенчмарк импорта оценок из CSV: POST /grading/assignments/{id}/import
+на одно задание со --students работами (по умолчанию 100k строк).
+
+    python -m app.utils.bench_grade_import --url http://localhost:8000 --students 100000 --pid <pid uvicorn>
+
+CSV генерируется на лету, отчёт читается потоком - ни клиент, ни сервер не
+держат файл целиком. С --pid печатается RSS процесса сервера до и пик во
+время импорта. Данные создаются так же, как в bench_grading (DATABASE_URL,
+SECRET_KEY должен совпадать с сервером). Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.utils.bench_grading import seed_teachers, seed
+from app.utils.bench_files import RssSampler
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+ROWS_PER_CHUNK = 1000
+
+
+async def csv_body(students: int):
+    yield b"email,score,comment\n"
+    for start in range(1, students + 1, ROWS_PER_CHUNK):
+        yield "".join(
+            f"grade_{i}@example.com,{random.randint(0, 100)},imported\n"
+            for i in range(start, min(start + ROWS_PER_CHUNK, students + 1))
+        ).encode()
+
+
+async def run_import(client, assignment_id, headers: dict, students: int, pid: int, label: str):
+    statuses = {}
+    first_row = None
+    async with RssSampler(pid) if pid else nullcontext() as rss:
+        started = time.perf_counter()
+        async with client.stream(
+            "POST",
+            f"/api/v1/grading/assignments/{assignment_id}/import",
+            content=csv_body(students),
+            headers={**headers, "Content-Type": "text/csv"}
+        ) as r:
+            r.raise_for_status()
+            lines = r.aiter_lines()
+            await lines.__anext__()  # заголовок отчёта
+            async for line in lines:
+                if first_row is None:
+                    first_row = time.perf_counter() - started
+                status = line.split(",")[2]
+                statuses[status] = statuses.get(status, 0) + 1
+        elapsed = time.perf_counter() - started
+
+    rows = sum(statuses.values())
+    print(f"{label}: {rows} rows in {elapsed:.2f}s -> {rows / elapsed:.0f} rows/s "
+          f"(first report row after {first_row * 1000:.0f} ms; {statuses})")
+    if rss:
+        print(f"  {rss.report()}")
+
+
+async def run_benchmark(url: str, students: int, pid: int):
+    [teacher_id] = seed_teachers(students, 1)
+    headers, [(assignment_id, _)] = seed(teacher_id, students, 1)
+
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        await run_import(client, assignment_id, headers, students, pid, "import (new)")
+        await run_import(client, assignment_id, headers, students, pid, "import (update)")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--pid", type=int, default=0, help="PID процесса uvicorn (замер RSS)")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.students, args.pid))
@@ -0,0 +1,95 @@
+"""
+Бенчмарк журнала оценок: GET /courses/{id}/gradebook на курсе
+--students x --assignments (по умолчанию 2000 x 200, цель - до 200 ms).
+
+    python -m app.utils.bench_gradebook --url http://localhost:8000 --students 2000 --assignments 200
+
+Курс, задания, работы и оценки (--graded доля работ) создаются напрямую в
+БД, как в bench_grading (DATABASE_URL, SECRET_KEY должен совпадать с
+сервером). Меряется полный ответ и повторный запрос с If-None-Match (304).
+Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.utils.bench_grading import seed_teachers, seed, percentile
+from app.utils.course_counters import reconcile_counters
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+GRADE_SQL = """
+INSERT INTO grades (id, submission_id, teacher_id, score, comment, graded_at, updated_at)
+SELECT gen_random_uuid(), s.id, :teacher_id, (random() * 100)::int, NULL, now(), now()
+FROM submissions s
+WHERE s.assignment_id = ANY(CAST(:assignment_ids AS uuid[])) AND random() < :graded
+"""
+
+
+def grade(teacher_id, plan: list, graded: float):
+    db = SessionLocal()
+    try:
+        assignment_ids = [str(assignment_id) for assignment_id, _ in plan]
+        db.execute(text(GRADE_SQL), {"teacher_id": teacher_id, "assignment_ids": assignment_ids, "graded": graded})
+        course_id = db.execute(
+            text("SELECT course_id FROM assignments WHERE id = :id"), {"id": assignment_ids[0]}
+        ).scalar()
+        reconcile_counters(db, [course_id])
+        db.execute(
+            text("UPDATE course_counters SET grades_updated_at = now() AT TIME ZONE 'utc' WHERE course_id = :id"),
+            {"id": course_id}
+        )
+        db.commit()
+        return course_id
+    finally:
+        db.close()
+
+
+async def measure(client, url: str, headers: dict, runs: int, label: str):
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        r = await client.get(url, headers=headers)
+        r.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    print(f"{label}: {r.status_code}, {len(r.content) / 1024:.0f} KB, "
+          f"p50 {percentile(latencies, 0.5):.1f} ms, p95 {percentile(latencies, 0.95):.1f} ms")
+    return r
+
+
+async def run_benchmark(url: str, students: int, assignments: int, graded: float, runs: int):
+    [teacher_id] = seed_teachers(students, 1)
+    headers, plan = seed(teacher_id, students, assignments)
+    course_id = grade(teacher_id, plan, graded)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        path = f"/api/v1/courses/{course_id}/gradebook"
+        r = await measure(client, path, headers, runs, f"gradebook {students}x{assignments}")
+        body = r.json()
+        print(f"  students {len(body['students'])}, assignments {len(body['assignments'])}, "
+              f"cells {len(body['scores'])}, graded {sum(score is not None for score in body['scores'])}")
+        await measure(client, path, {**headers, "If-None-Match": r.headers["etag"]}, runs, "if-none-match")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--assignments", type=int, default=200)
+    parser.add_argument("--graded", type=float, default=0.8, help="доля оценённых работ")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.students, args.assignments, args.graded, args.runs))
@@ -0,0 +1,199 @@
+"""
+Бенчмарк выставления оценок: POST /grading/assignments/{id}/grades/bulk
+против поштучного POST /grading/submissions/{id}/grade на одно задание.
+
+    python -m app.utils.bench_grading --url http://localhost:8000 --students 300
+
+С --teachers N меряется задержка поштучного выставления оценок, когда N
+преподавателей одновременно проверяют работы каждый своего курса (для
+сравнения до и после изменений пути записи оценки):
+
+    python -m app.utils.bench_grading --teachers 20 --students 200
+
+Студенты, курсы, задания и работы создаются напрямую в БД (DATABASE_URL).
+Токен подписывается локально - SECRET_KEY должен совпадать с сервером.
+Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.utils.auth import create_user_tokens
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+    SELECT gen_random_uuid(), 'grade_' || i || '@example.com', 'x', 'Grade Student ' || i,
+           'student'::userrole, true, false, 0, now()
+    FROM generate_series(1, :students) AS i
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+    SELECT gen_random_uuid(), 'gradeteacher_' || i || '@example.com', 'x', 'Grade Teacher ' || i,
+           'teacher'::userrole, true, false, 0, now()
+    FROM generate_series(1, :teachers) AS i
+    ON CONFLICT (email) DO NOTHING
+    """,
+]
+
+COURSE_SQL = [
+    """
+    INSERT INTO courses (id, title, teacher_id, is_published, created_at, updated_at)
+    VALUES (:course_id, 'Grading benchmark', :teacher_id, true, now(), now())
+    """,
+    """
+    INSERT INTO course_students (course_id, student_id, enrolled_at)
+    SELECT :course_id, id, now() FROM users
+    WHERE email LIKE 'grade\\_%@example.com' AND split_part(split_part(email, '_', 2), '@', 1)::int <= :students
+    """,
+]
+
+ASSIGNMENT_SQL = [
+    """
+    INSERT INTO assignments (id, course_id, title, max_score, created_at, updated_at)
+    VALUES (:assignment_id, :course_id, 'Grading benchmark', 100, now(), now())
+    """,
+    """
+    INSERT INTO submissions (id, assignment_id, student_id, content, status, submitted_at, updated_at)
+    SELECT gen_random_uuid(), :assignment_id, student_id, 'answer', 'pending'::submissionstatus, now(), now()
+    FROM course_students WHERE course_id = :course_id
+    """,
+]
+
+
+def seed_teachers(students: int, teachers: int) -> list:
+    db = SessionLocal()
+    try:
+        for statement in SEED_SQL:
+            db.execute(text(statement), {"students": students, "teachers": teachers})
+        db.commit()
+        return db.execute(
+            text("SELECT id FROM users WHERE email LIKE 'gradeteacher\\_%@example.com' ORDER BY email LIMIT :n"),
+            {"n": teachers}
+        ).scalars().all()
+    finally:
+        db.close()
+
+
+def seed(teacher_id, students: int, assignments: int):
+    course_id = uuid.uuid4()
+    db = SessionLocal()
+    try:
+        params = {"students": students, "course_id": course_id, "teacher_id": teacher_id}
+        for statement in COURSE_SQL:
+            db.execute(text(statement), params)
+
+        plan = []
+        for _ in range(assignments):
+            assignment_id = uuid.uuid4()
+            for statement in ASSIGNMENT_SQL:
+                db.execute(text(statement), {**params, "assignment_id": assignment_id})
+            submission_ids = db.execute(
+                text("SELECT id FROM submissions WHERE assignment_id = :id"), {"id": assignment_id}
+            ).scalars().all()
+            plan.append((assignment_id, [str(submission_id) for submission_id in submission_ids]))
+        db.commit()
+    finally:
+        db.close()
+
+    token = create_user_tokens(User(id=teacher_id, email="teacher", role=UserRole.teacher, token_version=0))
+    return {"Authorization": f"Bearer {token['access_token']}"}, plan
+
+
+def percentile(latencies: list, p: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+
+async def run_benchmark(url: str, students: int):
+    [teacher_id] = seed_teachers(students, 1)
+    headers, [(loop_assignment, loop_ids), (bulk_assignment, bulk_ids)] = seed(teacher_id, students, 2)
+
+    async with httpx.AsyncClient(base_url=url, timeout=300) as client:
+        latencies = []
+        started = time.perf_counter()
+        for submission_id in loop_ids:
+            call_started = time.perf_counter()
+            r = await client.post(
+                f"/api/v1/grading/submissions/{submission_id}/grade",
+                json={"score": random.randint(0, 100), "comment": "ok"},
+                headers=headers
+            )
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - call_started)
+        loop_elapsed = time.perf_counter() - started
+        print(f"one by one: {len(loop_ids)} grades in {loop_elapsed:.2f}s -> {len(loop_ids) / loop_elapsed:.0f} grades/s "
+              f"(p50 {percentile(latencies, 0.5):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms)")
+
+        body = {"grades": [
+            {"submission_id": submission_id, "score": random.randint(0, 100), "comment": "ok"}
+            for submission_id in bulk_ids
+        ]}
+        for label in ("bulk (new)", "bulk (update)"):
+            started = time.perf_counter()
+            r = await client.post(f"/api/v1/grading/assignments/{bulk_assignment}/grades/bulk", json=body, headers=headers)
+            r.raise_for_status()
+            elapsed = time.perf_counter() - started
+            result = r.json()
+            print(f"{label}: {len(bulk_ids)} grades in {elapsed:.3f}s -> {len(bulk_ids) / elapsed:.0f} grades/s "
+                  f"(graded {result['graded']}, updated {result['updated']}, errors {result['errors']}; "
+                  f"x{loop_elapsed / elapsed:.0f} vs one by one)")
+
+
+async def run_concurrent(url: str, students: int, teachers: int):
+    plans = [seed(teacher_id, students, 1) for teacher_id in seed_teachers(students, teachers)]
+    limits = httpx.Limits(max_connections=teachers * 2)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=300) as client:
+        latencies = []
+
+        async def grade_all(headers: dict, submission_ids: list):
+            for submission_id in submission_ids:
+                started = time.perf_counter()
+                r = await client.post(
+                    f"/api/v1/grading/submissions/{submission_id}/grade",
+                    json={"score": random.randint(0, 100), "comment": "ok"},
+                    headers=headers
+                )
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(grade_all(headers, ids) for headers, [(_, ids)] in plans))
+        elapsed = time.perf_counter() - started
+
+    print(f"{teachers} teachers x {students} grades: {len(latencies)} in {elapsed:.2f}s "
+          f"-> {len(latencies) / elapsed:.0f} grades/s")
+    print(f"latency p50 {percentile(latencies, 0.5):.1f} ms, p95 {percentile(latencies, 0.95):.1f} ms, "
+          f"p99 {percentile(latencies, 0.99):.1f} ms")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--teachers", type=int, default=0, help="одновременные преподаватели (поштучные оценки)")
+    args = parser.parse_args()
+
+    if args.teachers:
+        asyncio.run(run_concurrent(args.url, args.students, args.teachers))
+    else:
+        asyncio.run(run_benchmark(args.url, args.students))
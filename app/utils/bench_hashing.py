@@ -0,0 +1,36 @@
+"""
+Бенчмарк пула хеширования паролей: логинов в секунду на ядро
+"""
+import sys
+import os
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.config import settings
+from app.utils.auth import get_password_hash, verify_password_async, _hashing_pool
+
+
+async def run_benchmark(total: int = 200, concurrency: int = 32):
+    """Прогнать total проверок пароля при заданной конкурентности"""
+    hashed = get_password_hash("student123")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with semaphore:
+            ok, _ = await verify_password_async("student123", hashed)
+            assert ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    workers = _hashing_pool._max_workers
+    rate = total / elapsed
+    print(f"bcrypt rounds: {settings.BCRYPT_ROUNDS}, pool workers: {workers}")
+    print(f"{total} logins in {elapsed:.2f}s -> {rate:.1f} logins/sec, {rate / workers:.1f} logins/sec per core")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
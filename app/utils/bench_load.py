@@ -0,0 +1,72 @@
+"""
+Нагрузочный бенчмарк API: запросы в секунду и p99 при N одновременных клиентах.
+
+Запускать против поднятого сервера дважды - с DB_ASYNC=False и DB_ASYNC=True:
+    python -m app.utils.bench_load --url http://localhost:8000 --clients 500
+Требует httpx (pip install httpx) и тестовые данные из seed_data.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+async def run_benchmark(url: str, clients: int, duration: float, endpoint: str,
+                        email: str, password: str):
+    """Гонять GET endpoint с clients корутинами в течение duration секунд"""
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    r = await client.get(endpoint, headers=headers)
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{endpoint}: {len(latencies)} requests, {clients} clients, {errors} errors")
+    print(f"{len(latencies) / elapsed:.1f} req/s, p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--endpoint", default="/api/v1/courses/")
+    parser.add_argument("--email", default="teacher@test.com")
+    parser.add_argument("--password", default="teacher123")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.url, args.clients, args.duration, args.endpoint,
+                              args.email, args.password))
@@ -0,0 +1,79 @@
+"""
+Бенчмарк глубоких страниц: OFFSET против keyset-курсора по (created_at, id).
+
+    python -m app.utils.bench_pagination --seed   # засеять ~1M пользователей и замерить
+    python -m app.utils.bench_pagination          # замерить на текущих данных
+
+Запускать на отдельной базе: --seed пишет много синтетических данных.
+"""
+import sys
+import os
+import argparse
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+
+SEED_SQL = """
+INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+SELECT gen_random_uuid(), 'page_' || i || '@example.com', 'x', 'Page User ' || i,
+       'student'::userrole, true, false, 0, now() - (i || ' seconds')::interval
+FROM generate_series(1, :rows) AS i
+ON CONFLICT (email) DO NOTHING
+"""
+
+OFFSET_SQL = "SELECT * FROM users ORDER BY created_at, id OFFSET :offset LIMIT :limit"
+CURSOR_SQL = "SELECT created_at, id FROM users ORDER BY created_at, id OFFSET :offset LIMIT 1"
+KEYSET_SQL = """
+SELECT * FROM users WHERE (created_at, id) > (:created_at, :id)
+ORDER BY created_at, id LIMIT :limit
+"""
+
+
+def _timed(db, sql: str, params: dict, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(text(sql), params).all()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(seed: bool, rows: int, limit: int, repeat: int):
+    db = SessionLocal()
+    try:
+        if seed:
+            print("[?] seeding users..")
+            db.execute(text(SEED_SQL), {"rows": rows})
+            db.execute(text("ANALYZE users"))
+            db.commit()
+
+        total = db.execute(text("SELECT count(*) FROM users")).scalar()
+        print(f"users: {total}, page size: {limit}")
+
+        for fraction in (0.01, 0.1, 0.5, 0.9, 0.99):
+            offset = int(total * fraction)
+            # курсор, который клиент получил бы на предыдущей странице
+            cursor = db.execute(text(CURSOR_SQL), {"offset": max(offset - 1, 0)}).mappings().first()
+            if cursor is None:
+                continue
+
+            offset_ms = _timed(db, OFFSET_SQL, {"offset": offset, "limit": limit}, repeat)
+            keyset_ms = _timed(db, KEYSET_SQL, {**cursor, "limit": limit}, repeat)
+            print(f"offset {offset:>8}: OFFSET {offset_ms:8.2f} ms, keyset {keyset_ms:6.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.seed, args.rows, args.limit, args.repeat)
@@ -0,0 +1,64 @@
+"""
+Бенчмарк холодного старта: время импорта app.main и время до первого ответа.
+
+    python -m app.utils.bench_startup --runs 5
+"""
+import sys
+import os
+import argparse
+import socket
+import subprocess
+import time
+import urllib.request
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Время импорта app.main в свежем интерпретаторе, мс"""
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT_DIR)
+    return float(output.strip())
+
+
+def measure_first_request(timeout: float = 30) -> float:
+    """Время от запуска uvicorn до первого успешного ответа GET /, мс"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT_DIR,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError("server did not answer in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = sorted(measure_import() for _ in range(args.runs))
+    ready = sorted(measure_first_request() for _ in range(args.runs))
+    print(f"import app.main: median {imports[len(imports) // 2]:.0f} ms, max {imports[-1]:.0f} ms")
+    print(f"time to first request: median {ready[len(ready) // 2]:.0f} ms, max {ready[-1]:.0f} ms")
@@ -0,0 +1,123 @@
+"""
+Нагрузочный тест сдачи работ: N студентов одновременно сдают одно задание,
+каждый - дважды (гонка за уникальный индекс).
+
+    python -m app.utils.bench_submit --url http://localhost:8000 --students 1000
+
+Студенты, курс и задание создаются напрямую в БД (DATABASE_URL), токены
+подписываются локально - SECRET_KEY должен совпадать с сервером.
+Требует httpx (pip install httpx).
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.utils.auth import create_user_tokens
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, full_name, role, is_active, is_blocked, token_version, created_at)
+    SELECT gen_random_uuid(), 'submit_' || i || '@example.com', 'x', 'Submit Student ' || i,
+           'student'::userrole, true, false, 0, now()
+    FROM generate_series(1, :students) AS i
+    ON CONFLICT (email) DO NOTHING
+    """,
+    """
+    INSERT INTO courses (id, title, teacher_id, is_published, created_at, updated_at)
+    SELECT :course_id, 'Submit benchmark', id, true, now(), now()
+    FROM users WHERE role = 'teacher' LIMIT 1
+    """,
+    """
+    INSERT INTO assignments (id, course_id, title, max_score, created_at, updated_at)
+    VALUES (:assignment_id, :course_id, 'Submit benchmark', 100, now(), now())
+    """,
+    """
+    INSERT INTO course_students (course_id, student_id, enrolled_at)
+    SELECT :course_id, id, now() FROM users WHERE email LIKE 'submit\\_%@example.com'
+    """,
+]
+
+
+def seed(students: int):
+    course_id, assignment_id = uuid.uuid4(), uuid.uuid4()
+    params = {"students": students, "course_id": course_id, "assignment_id": assignment_id}
+    db = SessionLocal()
+    try:
+        for statement in SEED_SQL:
+            db.execute(text(statement), params)
+        db.commit()
+        rows = db.execute(
+            text("SELECT id, email FROM users WHERE email LIKE 'submit\\_%@example.com'")
+        ).all()
+    finally:
+        db.close()
+
+    tokens = [
+        create_user_tokens(User(id=user_id, email=email, role=UserRole.student, token_version=0))["access_token"]
+        for user_id, email in rows
+    ]
+    return assignment_id, tokens
+
+
+def count_submissions(assignment_id) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            text("SELECT count(*) FROM submissions WHERE assignment_id = :id"), {"id": assignment_id}
+        ).scalar()
+    finally:
+        db.close()
+
+
+async def run_benchmark(url: str, students: int):
+    assignment_id, tokens = seed(students)
+    endpoint = f"/api/v1/assignments/{assignment_id}/submit"
+    limits = httpx.Limits(max_connections=len(tokens) * 2)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        latencies = []
+
+        async def submit(token: str) -> int:
+            started = time.perf_counter()
+            r = await client.post(endpoint, json={"content": "answer"}, headers={"Authorization": f"Bearer {token}"})
+            latencies.append(time.perf_counter() - started)
+            return r.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(submit(token) for token in tokens for _ in range(2)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    codes = Counter(statuses)
+    stored = count_submissions(assignment_id)
+    print(f"{len(statuses)} submits from {len(tokens)} students in {elapsed:.2f}s -> {len(statuses) / elapsed:.0f} req/s")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"status codes: {dict(codes)}")
+    print(f"stored submissions: {stored} (expected {len(tokens)})")
+    return stored == len(tokens) and codes.get(200) == len(tokens)
+
+
+if __name__ == "__main__":
+    if httpx is None:
+        sys.exit("httpx is required: pip install httpx")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run_benchmark(args.url, args.students)) else 1)
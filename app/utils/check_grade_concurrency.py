@@ -0,0 +1,85 @@
+"""
+Проверка счётчиков курса при параллельном выставлении оценок: несколько
+upsert_grades одновременно на одни и те же работы (новые оценки и
+переоценка), после каждого раунда - сверка course_counters с таблицами.
+
+    python -m app.utils.check_grade_concurrency --rounds 20 --concurrency 8
+
+Курс, задание и работы создаются как в bench_grading (DATABASE_URL).
+Код возврата 1, если reconcile_counters нашёл дрейф.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import text
+from app.database import SessionLocal, _new_async_session
+from app.utils.bench_grading import seed_teachers, seed
+from app.utils.course_counters import reconcile_counters
+from app.utils.grade_upsert import GradeInput, upsert_grades
+
+
+async def grade_once(course_id, assignment_id, teacher_id, submission_ids: list):
+    db = _new_async_session()
+    try:
+        rows = [GradeInput(submission_id, random.randint(0, 100), None) for submission_id in submission_ids]
+        random.shuffle(rows)
+        await upsert_grades(db, course_id, assignment_id, teacher_id, rows)
+        await db.commit()
+    finally:
+        await db.close()
+
+
+def drift(course_id) -> bool:
+    db = SessionLocal()
+    try:
+        repaired = reconcile_counters(db, [course_id])
+        db.commit()
+        return bool(repaired)
+    finally:
+        db.close()
+
+
+async def run_check(rounds: int, concurrency: int, batch: int) -> int:
+    [teacher_id] = seed_teachers(batch * rounds, 1)
+    _, [(assignment_id, submission_ids)] = seed(teacher_id, batch * rounds, 1)
+    db = SessionLocal()
+    try:
+        course_id = db.execute(
+            text("SELECT course_id FROM assignments WHERE id = :id"), {"id": assignment_id}
+        ).scalar()
+    finally:
+        db.close()
+    drift(course_id)  # засеянные напрямую работы - в счётчики
+
+    failures = 0
+    for i in range(rounds):
+        # одни и те же работы: сначала без оценок, затем переоценка
+        ids = submission_ids[i * batch:(i + 1) * batch]
+        for label in ("new", "update"):
+            await asyncio.gather(*(
+                grade_once(course_id, assignment_id, teacher_id, ids) for _ in range(concurrency)
+            ))
+            if drift(course_id):
+                failures += 1
+                print(f"[!] round {i + 1} ({label}): counters drifted")
+
+    if failures:
+        print(f"[!] {failures} of {rounds * 2} rounds drifted")
+        return 1
+    print(f"[+] {rounds * 2} rounds x {concurrency} concurrent upserts: counters in sync")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=5, help="работ в одном upsert")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run_check(args.rounds, args.concurrency, args.batch)))
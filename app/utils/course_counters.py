@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.course_counter import CourseCounter
+from app.models.submission import Submission, SubmissionStatus
+from app.models.grade import Grade
+
+# Счётчики меняются в той же транзакции, что и сами данные: вызывающий
+# делает bump до commit. Каскадные удаления (пользователь, задание)
+# и ручные правки в БД исправляет reconcile_counters.
+
+COUNTER_FIELDS = ("students", "assignments", "materials", "submissions", "pending", "graded", "score_sum")
+
+RECOMPUTE_SQL = """
+INSERT INTO course_counters (course_id, students, assignments, materials, submissions, pending, graded, score_sum, updated_at)
+SELECT c.id,
+       coalesce(s.n, 0), coalesce(a.n, 0), coalesce(m.n, 0),
+       coalesce(sub.n, 0), coalesce(sub.pending, 0), coalesce(g.n, 0), coalesce(g.total, 0),
+       now() AT TIME ZONE 'utc'
+FROM courses c
+LEFT JOIN (SELECT course_id, count(*) AS n FROM course_students GROUP BY course_id) s ON s.course_id = c.id
+LEFT JOIN (SELECT course_id, count(*) AS n FROM assignments GROUP BY course_id) a ON a.course_id = c.id
+LEFT JOIN (SELECT course_id, count(*) AS n FROM materials GROUP BY course_id) m ON m.course_id = c.id
+LEFT JOIN (
+    SELECT a.course_id, count(*) AS n, count(*) FILTER (WHERE s.status = 'pending') AS pending
+    FROM submissions s JOIN assignments a ON a.id = s.assignment_id
+    GROUP BY a.course_id
+) sub ON sub.course_id = c.id
+LEFT JOIN (
+    SELECT a.course_id, count(*) AS n, sum(g.score) AS total
+    FROM grades g
+    JOIN submissions s ON s.id = g.submission_id
+    JOIN assignments a ON a.id = s.assignment_id
+    GROUP BY a.course_id
+) g ON g.course_id = c.id
+{where}
+ON CONFLICT (course_id) DO UPDATE SET
+    students = excluded.students,
+    assignments = excluded.assignments,
+    materials = excluded.materials,
+    submissions = excluded.submissions,
+    pending = excluded.pending,
+    graded = excluded.graded,
+    score_sum = excluded.score_sum,
+    updated_at = excluded.updated_at
+WHERE (course_counters.students, course_counters.assignments, course_counters.materials,
+       course_counters.submissions, course_counters.pending, course_counters.graded, course_counters.score_sum)
+      IS DISTINCT FROM
+      (excluded.students, excluded.assignments, excluded.materials,
+       excluded.submissions, excluded.pending, excluded.graded, excluded.score_sum)
+RETURNING course_id
+"""
+
+
+def _bump_statement(course_id: UUID, deltas: dict, grades_changed: bool = False):
+    now = datetime.utcnow()
+    stamps = {"updated_at": now, **({"grades_updated_at": now} if grades_changed else {})}
+    stmt = pg_insert(CourseCounter).values(course_id=course_id, **stamps, **deltas)
+    return stmt.on_conflict_do_update(
+        index_elements=[CourseCounter.course_id],
+        set_={
+            **{name: CourseCounter.__table__.c[name] + stmt.excluded[name] for name in deltas},
+            **{name: stmt.excluded[name] for name in stamps},
+        }
+    )
+
+
+async def bump_course_counters(db, course_id: UUID, grades_changed: bool = False, **deltas) -> None:
+    """Атомарно изменить счётчики курса в текущей транзакции (коммитит вызывающий).
+
+    grades_changed=True сдвигает grades_updated_at (версию журнала оценок),
+    даже если сами счётчики не изменились.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas or grades_changed:
+        await db.execute(_bump_statement(course_id, deltas, grades_changed))
+
+
+async def assignment_counter_deltas(db, assignment_id: UUID) -> dict:
+    """Что вычесть из счётчиков курса при удалении задания (работы и оценки уйдут каскадом)"""
+    submissions, pending, graded, score_sum = (await db.execute(
+        select(
+            func.count(Submission.id),
+            func.count(Submission.id).filter(Submission.status == SubmissionStatus.pending),
+            func.count(Grade.id),
+            func.coalesce(func.sum(Grade.score), 0)
+        )
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(Submission.assignment_id == assignment_id)
+    )).one()
+    return {
+        "assignments": -1,
+        "submissions": -submissions,
+        "pending": -pending,
+        "graded": -graded,
+        "score_sum": -int(score_sum),
+    }
+
+
+def reconcile_counters(db: Session, course_ids: Optional[Iterable[UUID]] = None) -> list:
+    """Пересчитать счётчики из исходных таблиц; возвращает курсы, где был дрейф"""
+    if course_ids is None:
+        return list(db.execute(text(RECOMPUTE_SQL.format(where=""))).scalars())
+
+    course_ids = list(course_ids)
+    if not course_ids:
+        return []
+    sql = RECOMPUTE_SQL.format(where="WHERE c.id = ANY(CAST(:course_ids AS uuid[]))")
+    return list(db.execute(text(sql), {"course_ids": [str(course_id) for course_id in course_ids]}).scalars())
@@ -0,0 +1,35 @@
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import select
+
+from app.models.course_counter import CourseCounter
+
+# поле ответа -> колонка course_counters
+COUNT_FIELDS = {
+    "students_count": "students",
+    "assignments_count": "assignments",
+    "materials_count": "materials",
+    "pending_submissions": "pending",
+}
+
+
+async def get_course_counts(db, course_ids: List[UUID]) -> Dict[UUID, dict]:
+    """Счётчики по курсам: точечное чтение course_counters по первичному ключу"""
+    if not course_ids:
+        return {}
+
+    counters = {
+        counter.course_id: counter
+        for counter in (await db.scalars(
+            select(CourseCounter).where(CourseCounter.course_id.in_(course_ids))
+        )).all()
+    }
+
+    # строки ещё нет - у курса пока ничего не было
+    return {
+        course_id: {
+            field: getattr(counters[course_id], column) if course_id in counters else 0
+            for field, column in COUNT_FIELDS.items()
+        }
+        for course_id in course_ids
+    }
@@ -0,0 +1,70 @@
+import codecs
+import csv
+import io
+import tempfile
+from typing import IO, AsyncIterator, List, Tuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Разбор CSV из потока байтов (тело запроса) без чтения его целиком в память"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    # запись с незакрытой кавычкой (перевод строки внутри поля) копится
+    # по строкам, в том числе через границу чанков
+    record = ""
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = io.StringIO(buffer, newline="").readlines()
+        # последняя строка может быть неполной - ждём следующий чанк
+        buffer = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        records = []
+        for line in lines:
+            record += line
+            if record.count('"') % 2 == 0:
+                records.append(record)
+                record = ""
+        for row in csv.reader(records):
+            if row:
+                yield row
+
+    record += buffer + decoder.decode(b"", final=True)
+    if record:
+        for row in csv.reader([record]):
+            if row:
+                yield row
+
+
+async def spool_csv(chunks: AsyncIterator[bytes], max_bytes: int) -> IO[str]:
+    """Сохранить CSV из потока во временный файл на диске и открыть его на чтение.
+
+    Нужен, когда ответ отдаётся потоком, пока разбирается тело: тело
+    запроса к этому моменту должно быть прочитано, а в памяти его не держим.
+    """
+    spool = tempfile.TemporaryFile()
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File too large (limit {max_bytes} bytes)")
+            await run_in_threadpool(spool.write, chunk)
+        await run_in_threadpool(spool.seek, 0)
+    except BaseException:
+        spool.close()
+        raise
+    return io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+
+
+def read_csv_batch(reader, size: int) -> List[Tuple[int, List[str]]]:
+    """Следующие size строк csv.reader с номерами строк файла (пустые
+    пропускаются); [] - конец файла"""
+    batch = []
+    for row in reader:
+        if row:
+            batch.append((reader.line_num, row))
+            if len(batch) == size:
+                break
+    return batch
@@ -0,0 +1,29 @@
+from typing import Hashable, Optional
+from uuid import UUID
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# student_id -> {параметры страницы: (ответ, курсор следующей страницы)}.
+# Сдача работы, оценка и запись на курс сбрасывают кэш студента сразу;
+# правки заданий преподавателем видны по истечении DASHBOARD_CACHE_TTL_SECONDS.
+dashboard_cache = TTLCache(maxsize=settings.DASHBOARD_CACHE_MAX_SIZE, ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+
+def get_dashboard_page(student_id: UUID, page_key: Hashable) -> Optional[tuple]:
+    pages = dashboard_cache.get(str(student_id))
+    if pages is None:
+        return None
+    return pages.get(page_key)
+
+
+def set_dashboard_page(student_id: UUID, page_key: Hashable, payload: dict, next_cursor: Optional[str]) -> None:
+    key = str(student_id)
+    pages = dict(dashboard_cache.get(key) or {})
+    pages[page_key] = (payload, next_cursor)
+    dashboard_cache.set(key, pages)
+
+
+def invalidate_dashboard(student_id: UUID) -> None:
+    """Сбросить закэшированный дашборд студента (сдача, оценка, запись на курс)"""
+    dashboard_cache.pop(str(student_id))
@@ -0,0 +1,130 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# ASGI scope текущего запроса - выставляется RouteContextMiddleware
+current_request_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def _route_name() -> str:
+    scope = current_request_scope.get()
+    if scope is None:
+        return "<no request>"
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return f"{scope.get('method', '')} {route.path}".strip()
+    return scope.get("path", "<unknown>")
+
+
+class PoolMetrics:
+    """Счётчики пула соединений: ожидание checkout и время удержания по роутам"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_total_ms = 0.0
+        self.wait_count = 0
+        self.timeouts = 0
+        self.hold_by_route: dict = {}
+
+    def observe_wait(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.wait_total_ms += wait_ms
+            self.wait_count += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def observe_hold(self, route: str, hold_ms: float) -> None:
+        with self._lock:
+            stats = self.hold_by_route.setdefault(route, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += hold_ms
+            stats["max_ms"] = max(stats["max_ms"], hold_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={b}ms" for b in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "timeouts": self.timeouts,
+                    "histogram": dict(zip(labels, self.wait_histogram)),
+                },
+                "checkout_hold_by_route": {
+                    route: {
+                        "count": stats["count"],
+                        "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                        "max_ms": round(stats["max_ms"], 3),
+                    }
+                    for route, stats in sorted(self.hold_by_route.items())
+                },
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckoutMixin:
+    """Замер времени ожидания свободного соединения"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except Exception:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.observe_wait((time.perf_counter() - started) * 1000, timed_out)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine) -> None:
+    """Повесить на пул слушатели checkout/checkin для учёта удержания соединений"""
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        connection_record.info["checkout_route"] = _route_name()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        route = connection_record.info.pop("checkout_route", "<unknown>")
+        if started is not None:
+            pool_metrics.observe_hold(route, (time.perf_counter() - started) * 1000)
+
+
+def pool_status(engine) -> dict:
+    """Текущее состояние пула соединений"""
+    pool = engine.pool
+    checked_out = pool.checkedout()
+    # max_overflow < 0 - переполнение без ограничения: пул не исчерпывается
+    bounded = pool._max_overflow >= 0
+    capacity = pool.size() + pool._max_overflow if bounded else None
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturated": bounded and checked_out >= capacity,
+    }
@@ -1,17 +1,88 @@
+import time
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_async_db
 from app.models.user import User
-from app.models.admin_permission import AdminPermission
+from app.models.admin_permission import has_permission
 from app.utils.auth import decode_access_token
+from app.utils.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# Кэши живут в памяти процесса: при нескольких воркерах инвалидация локальная,
+# устаревание в остальных воркерах ограничено AUTH_CACHE_TTL_SECONDS
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+_USER_SNAPSHOT_FIELDS = [column.key for column in User.__table__.columns]
+
+
+def invalidate_user_cache(user_id) -> None:
+    """Сбросить закэшированный снимок пользователя (блокировка, смена роли, удаление)"""
+    user_cache.pop(str(user_id))
+
+
+def revoke_user_tokens(user: User) -> None:
+    """Отозвать все выданные пользователю токены (изменения коммитит вызывающий)"""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def get_auth_cache_stats() -> dict:
+    """Счётчики попаданий/промахов кэшей аутентификации"""
+    return {
+        "tokens": token_cache.stats(),
+        "users": user_cache.stats(),
+    }
+
+
+def _decode_token_cached(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+
+    # не держим токен в кэше дольше его собственного срока жизни
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp else None
+    token_cache.set(token, payload, ttl=ttl)
+    return payload
+
+
+async def _load_user_cached(user_id: UUID, db: AsyncSession):
+    key = str(user_id)
+    snapshot = user_cache.get(key)
+    if snapshot is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = {field: getattr(user, field) for field in _USER_SNAPSHOT_FIELDS}
+        user_cache.set(key, snapshot)
+
+    # отдаём новый transient-объект, чтобы запросы не делили одно состояние
+    return User(**snapshot)
+
+
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Проверенные claims access-токена"""
+    payload = _decode_token_cached(token)
+    if payload is None or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Получение текущего пользователя из токена"""
     credentials_exception = HTTPException(
@@ -20,16 +91,17 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_access_token(token)
-    if payload is None:
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
         raise credentials_exception
 
-    email: str = payload.get("sub")
-    if email is None:
+    user = await _load_user_cached(user_id, db)
+    if user is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    # токен выпущен до смены прав/блокировки
+    if payload.get("ver", 0) != (user.token_version or 0):
         raise credentials_exception
 
     if not user.is_active or user.is_blocked:
@@ -53,19 +125,12 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
 
 
 def check_permission(permission: str):
-    """Проверка конкретного права админа"""
+    """Проверка конкретного права админа (по маске из токена, без запроса в БД)"""
     async def _check(
         current_user: User = Depends(get_current_admin),
-        db: Session = Depends(get_db)
+        payload: dict = Depends(get_token_payload)
     ):
-        perms = db.query(AdminPermission).filter(
-            AdminPermission.user_id == current_user.id
-        ).first()
-
-        if not perms:
-            raise HTTPException(status_code=403, detail=f"Permission {permission} required")
-
-        if not getattr(perms, permission, False):
+        if not has_permission(payload.get("perms", 0), permission):
             raise HTTPException(status_code=403, detail=f"Permission {permission} required")
 
         return current_user
@@ -0,0 +1,327 @@
+import asyncio
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, func
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import _new_async_session
+from app.models.course import course_students
+
+# Индекс живёт в памяти процесса: записи и отчисления через этот воркер видны
+# сразу, в остальных воркерах устаревание ограничено ENROLLMENT_INDEX_TTL_SECONDS
+# плюс время перезагрузки. Перезагрузка идёт в фоне: запросы её не ждут и
+# пока читают прежний снимок. Отрицательный ответ при проверке записи всё
+# равно перепроверяется в БД.
+
+
+def _contains(values: array, value: int) -> bool:
+    i = bisect_left(values, value)
+    return i < len(values) and values[i] == value
+
+
+def _insert(values: array, value: int) -> bool:
+    i = bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        return False
+    values.insert(i, value)
+    return True
+
+
+def _remove(values: array, value: int) -> bool:
+    i = bisect_left(values, value)
+    if i < len(values) and values[i] == value:
+        del values[i]
+        return True
+    return False
+
+
+class EnrollmentIndex:
+    """Курс -> отсортированный массив студентов, студент -> массив курсов.
+
+    UUID интернируются в 32-битные номера, поэтому одна запись стоит
+    8 байт в двух массивах плюс таблица интернирования.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        # write-through изменения, пришедшие во время загрузки (None - загрузки нет)
+        self._pending: Optional[list] = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_errors = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._slots: dict = {}
+        self._uuids: List[UUID] = []
+        self._course_students: dict = {}
+        self._student_courses: dict = {}
+        self._size = 0
+        self._loaded_at: Optional[float] = None
+        self.overflowed = False
+
+    def _slot(self, uuid: UUID) -> int:
+        slot = self._slots.get(uuid)
+        if slot is None:
+            slot = len(self._uuids)
+            self._slots[uuid] = slot
+            self._uuids.append(uuid)
+        return slot
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _available(self) -> bool:
+        return self._loaded_at is not None and not self.overflowed
+
+    @staticmethod
+    def _build_state(rows: Iterable[Tuple[UUID, UUID]]) -> tuple:
+        """Массивы индекса из пар (course_id, student_id) - без блокировки, вне event loop"""
+        slots: dict = {}
+        uuids: List[UUID] = []
+
+        def slot(uuid: UUID) -> int:
+            value = slots.get(uuid)
+            if value is None:
+                value = slots[uuid] = len(uuids)
+                uuids.append(uuid)
+            return value
+
+        course_students_map: dict = {}
+        student_courses_map: dict = {}
+        size = 0
+        for course_id, student_id in rows:
+            course_slot, student_slot = slot(course_id), slot(student_id)
+            course_students_map.setdefault(course_slot, []).append(student_slot)
+            student_courses_map.setdefault(student_slot, []).append(course_slot)
+            size += 1
+
+        return (
+            slots,
+            uuids,
+            {k: array("I", sorted(v)) for k, v in course_students_map.items()},
+            {k: array("I", sorted(v)) for k, v in student_courses_map.items()},
+            size
+        )
+
+    def _install(self, state: tuple) -> None:
+        """Подменить снимок и доиграть изменения, записанные во время загрузки (под _lock)"""
+        self._slots, self._uuids, self._course_students, self._student_courses, self._size = state
+        self._loaded_at = time.monotonic()
+        self.overflowed = False
+        # снимок мог увидеть эти изменения, а мог и нет: повтор идемпотентен
+        pending, self._pending = self._pending or [], None
+        for op, args in pending:
+            op(*args)
+
+    def build(self, rows: Iterable[Tuple[UUID, UUID]]) -> None:
+        """Заполнить индекс парами (course_id, student_id)"""
+        state = self._build_state(rows)
+        with self._lock:
+            self._install(state)
+
+    async def _load(self) -> None:
+        with self._lock:
+            self._pending = []
+        try:
+            db = _new_async_session()
+            try:
+                total = await db.scalar(select(func.count()).select_from(course_students))
+                if total > self.max_size:
+                    with self._lock:
+                        self._reset()
+                        self.overflowed = True
+                        self._loaded_at = time.monotonic()
+                    return
+
+                rows = (await db.execute(
+                    select(course_students.c.course_id, course_students.c.student_id)
+                )).all()
+            finally:
+                await db.close()
+
+            state = await run_in_threadpool(self._build_state, rows)
+            with self._lock:
+                self._install(state)
+            self.loads += 1
+        finally:
+            with self._lock:
+                self._pending = None
+
+    async def _refresh(self) -> None:
+        try:
+            await self._load()
+        except Exception:
+            # БД недоступна - работаем на прежнем снимке (или через БД), повтор через TTL
+            self.load_errors += 1
+            self._retry_at = time.monotonic() + self.ttl
+        finally:
+            self._refresh_task = None
+
+    async def ensure_loaded(self) -> bool:
+        """Доступен ли индекс. Первая загрузка и обновление по TTL идут в фоне:
+        пока они идут, отвечает прежний снимок (или вызывающий идёт в БД)"""
+        if self.ttl <= 0:
+            return False
+        if not self._fresh() and self._refresh_task is None and time.monotonic() >= self._retry_at:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+        return self._available()
+
+    async def contains(self, course_id: UUID, student_id: UUID) -> bool:
+        """Записан ли студент на курс (False - нет в индексе или индекс недоступен)"""
+        if not await self.ensure_loaded():
+            return False
+
+        with self._lock:
+            course_slot, student_slot = self._slots.get(course_id), self._slots.get(student_id)
+            found = (
+                course_slot is not None
+                and student_slot is not None
+                and _contains(self._course_students.get(course_slot, ()), student_slot)
+            )
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+
+    async def student_courses(self, student_id: UUID) -> Optional[List[UUID]]:
+        """Курсы студента или None, если индекс недоступен"""
+        if not await self.ensure_loaded():
+            return None
+
+        with self._lock:
+            self.hits += 1
+            slot = self._slots.get(student_id)
+            if slot is None:
+                return []
+            return [self._uuids[course_slot] for course_slot in self._student_courses.get(slot, ())]
+
+    def _journal(self, op, *args) -> None:
+        """Применить изменение; во время загрузки ещё и запомнить его для доигрывания"""
+        if self._pending is not None:
+            self._pending.append((op, args))
+        op(*args)
+
+    def add(self, course_id: UUID, student_id: UUID) -> None:
+        """Write-through после успешной записи на курс"""
+        with self._lock:
+            self._journal(self._add, course_id, student_id)
+
+    def remove(self, course_id: UUID, student_id: UUID) -> None:
+        """Write-through после отчисления с курса"""
+        with self._lock:
+            self._journal(self._remove, course_id, student_id)
+
+    def drop_course(self, course_id: UUID) -> None:
+        """Курс удалён - вместе с ним каскадом удалены записи"""
+        with self._lock:
+            self._journal(self._drop_course, course_id)
+
+    def drop_student(self, student_id: UUID) -> None:
+        """Пользователь удалён - вместе с ним каскадом удалены записи"""
+        with self._lock:
+            self._journal(self._drop_student, student_id)
+
+    def _add(self, course_id: UUID, student_id: UUID) -> None:
+        if self._loaded_at is None or self.overflowed:
+            return
+        if self._size >= self.max_size:
+            self._reset()
+            return
+
+        course_slot, student_slot = self._slot(course_id), self._slot(student_id)
+        if _insert(self._course_students.setdefault(course_slot, array("I")), student_slot):
+            _insert(self._student_courses.setdefault(student_slot, array("I")), course_slot)
+            self._size += 1
+
+    def _remove(self, course_id: UUID, student_id: UUID) -> None:
+        course_slot, student_slot = self._slots.get(course_id), self._slots.get(student_id)
+        if course_slot is None or student_slot is None:
+            return
+
+        if _remove(self._course_students.get(course_slot, array("I")), student_slot):
+            _remove(self._student_courses.get(student_slot, array("I")), course_slot)
+            self._size -= 1
+
+    def _drop_course(self, course_id: UUID) -> None:
+        course_slot = self._slots.get(course_id)
+        if course_slot is None:
+            return
+
+        for student_slot in self._course_students.pop(course_slot, ()):
+            _remove(self._student_courses.get(student_slot, array("I")), course_slot)
+            self._size -= 1
+
+    def _drop_student(self, student_id: UUID) -> None:
+        student_slot = self._slots.get(student_id)
+        if student_slot is None:
+            return
+
+        for course_slot in self._student_courses.pop(student_slot, ()):
+            _remove(self._course_students.get(course_slot, array("I")), student_slot)
+            self._size -= 1
+
+    def memory_bytes(self) -> int:
+        """Примерный объём массивов индекса (без таблицы интернирования)"""
+        with self._lock:
+            arrays = list(self._course_students.values()) + list(self._student_courses.values())
+            return sum(values.buffer_info()[1] * values.itemsize for values in arrays)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._available(),
+                "overflowed": self.overflowed,
+                "size": self._size,
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "ids": len(self._uuids),
+                "loads": self.loads,
+                "load_errors": self.load_errors,
+                "refreshing": self._refresh_task is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+enrollment_index = EnrollmentIndex(
+    max_size=settings.ENROLLMENT_INDEX_MAX_SIZE,
+    ttl=settings.ENROLLMENT_INDEX_TTL_SECONDS,
+)
+
+
+async def is_enrolled(db, course_id: UUID, student_id: UUID) -> bool:
+    """Проверка записи на курс: индекс, а при отрицательном ответе - БД"""
+    if await enrollment_index.contains(course_id, student_id):
+        return True
+
+    enrolled = (await db.execute(
+        select(course_students.c.course_id).where(
+            course_students.c.course_id == course_id,
+            course_students.c.student_id == student_id
+        )
+    )).first()
+    return enrolled is not None
+
+
+async def get_student_course_ids(db, student_id: UUID) -> List[UUID]:
+    """ID курсов студента: из индекса, если он доступен, иначе из БД"""
+    course_ids = await enrollment_index.student_courses(student_id)
+    if course_ids is not None:
+        return course_ids
+
+    return list((await db.scalars(
+        select(course_students.c.course_id).where(course_students.c.student_id == student_id)
+    )).all())
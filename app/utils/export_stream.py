@@ -0,0 +1,54 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
+from uuid import UUID
+
+from app.config import settings
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Экспорт читается серверным курсором пачками по EXPORT_BATCH_SIZE строк и
+# кодируется по пачке: в памяти воркера не больше одной пачки, сколько бы
+# строк ни было в курсе
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(rows: Iterable[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else _plain(value) for value in row])
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows: Iterable[dict]) -> bytes:
+    return "".join(
+        json.dumps(row, default=_plain, ensure_ascii=False) + "\n" for row in rows
+    ).encode()
+
+
+async def iter_partitions(db, stmt, size: Optional[int] = None) -> AsyncIterator[list]:
+    """Строки запроса пачками через серверный курсор (yield_per)"""
+    size = size or settings.EXPORT_BATCH_SIZE
+    result = await db.stream(stmt.execution_options(yield_per=size))
+    async for partition in result.partitions(size):
+        yield partition
+
+
+def attachment_headers(filename: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
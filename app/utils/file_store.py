@@ -0,0 +1,303 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from typing import NamedTuple, Optional
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.conditional import conditional_response
+
+# Файлы хранятся на диске под именем sha256 содержимого: одинаковые загрузки
+# (в том числе в разные курсы) занимают место один раз. Загрузка пишется
+# чанками во временный файл с подсчётом хеша и атомарно переносится на место.
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 256 * 1024
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    size: int
+    filename: Optional[str]
+    content_type: Optional[str]
+
+
+def storage_root() -> str:
+    return os.path.abspath(settings.FILE_STORAGE_DIR)
+
+
+def blob_path(sha256: str) -> str:
+    if not _SHA256.match(sha256):
+        raise HTTPException(status_code=404, detail="File not found")
+    return os.path.join(storage_root(), sha256[:2], sha256[2:4], sha256)
+
+
+class BlobWriter:
+    """Запись одного файла: временный файл + sha256 на лету, без буфера в памяти"""
+
+    def __init__(self, max_bytes: int):
+        tmp_dir = os.path.join(storage_root(), "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=f"File too large (limit {self.max_bytes} bytes)")
+        self._hash.update(data)
+        self._file.write(data)
+
+    def commit(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        sha256 = self._hash.hexdigest()
+        path = blob_path(sha256)
+        try:
+            # такой файл уже есть: освежаем mtime, чтобы collect_garbage не удалил
+            # его до того, как загрузка запишет ссылку в course_files
+            os.utime(path)
+            os.unlink(self._file.name)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._file.name, path)
+        return sha256
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._file.name):
+            os.unlink(self._file.name)
+
+
+async def receive_upload(request: Request, max_bytes: int, field: str = "file") -> StoredBlob:
+    """Принять поле field из multipart/form-data потоком и положить в хранилище"""
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data")
+
+    # колбэки парсера синхронные - копим события и разбираем их после каждого чанка
+    events = []
+    header = {"field": b"", "value": b""}
+
+    def on_part_begin():
+        events.append(("begin", None))
+
+    def on_header_field(data, start, end):
+        header["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        header["value"] += data[start:end]
+
+    def on_header_end():
+        events.append(("header", (header["field"].lower(), header["value"])))
+        header["field"], header["value"] = b"", b""
+
+    def on_part_data(data, start, end):
+        events.append(("data", data[start:end]))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    writer = None
+    meta = None
+    part_headers = {}
+    done = False
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            pending = []
+            for kind, payload in events:
+                if kind == "begin":
+                    part_headers = {}
+                elif kind == "header":
+                    part_headers[payload[0]] = payload[1]
+                elif writer is None:
+                    # первое тело нужного поля (или его конец, если файл пустой)
+                    meta = _file_part(part_headers, field)
+                    if meta is None:
+                        continue
+                    writer = await run_in_threadpool(BlobWriter, max_bytes)
+                if writer is not None and kind == "data":
+                    pending.append(payload)
+                elif writer is not None and kind == "end":
+                    done = True
+                    break
+            events.clear()
+
+            if pending:
+                await run_in_threadpool(writer.write, b"".join(pending))
+            if done:
+                break
+
+        if writer is None:
+            raise HTTPException(status_code=400, detail=f"Missing '{field}' file field")
+        if not done:
+            raise HTTPException(status_code=400, detail="Incomplete multipart body")
+        sha256 = await run_in_threadpool(writer.commit)
+    except BaseException:
+        if writer is not None:
+            await run_in_threadpool(writer.abort)
+        raise
+
+    return StoredBlob(sha256, writer.size, *meta)
+
+
+def _file_part(part_headers: dict, field: str) -> Optional[tuple]:
+    """(filename, content_type), если часть - файл из поля field"""
+    _, options = parse_options_header(part_headers.get(b"content-disposition", b""))
+    if options.get(b"name", b"").decode(errors="replace") != field:
+        return None
+    filename = options.get(b"filename")
+    content_type = part_headers.get(b"content-type")
+    return (
+        filename.decode(errors="replace") if filename else None,
+        content_type.decode(errors="replace") if content_type else None
+    )
+
+
+def collect_garbage(referenced: set, min_age_seconds: int = 3600) -> int:
+    """Удалить blob'ы без ссылок из course_files (и брошенные временные файлы).
+
+    Возраст считается по mtime: новая загрузка и повторная загрузка уже
+    существующего blob'а (BlobWriter.commit) обновляют его, так что blob,
+    на который вот-вот появится ссылка, моложе min_age_seconds.
+    """
+    removed = 0
+    cutoff = time.time() - min_age_seconds
+    for dirpath, _, filenames in os.walk(storage_root()):
+        is_tmp = os.path.basename(dirpath) == "tmp"
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if (is_tmp or name not in referenced) and os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+    return removed
+
+
+def _content_disposition(filename: Optional[str]) -> str:
+    if not filename:
+        return "attachment"
+    ascii_name = filename.encode("ascii", "replace").decode().replace('"', "")
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple]:
+    """Один диапазон bytes=a-b / a- / -n -> (offset, count); несколько - отдаём файл целиком"""
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-0 (и любой suffix у пустого файла) по RFC 9110 невыполним
+        start, end = size - min(int(last), size), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise HTTPException(
+            status_code=416, detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end - start + 1
+
+
+class BlobResponse(Response):
+    """Отдача файла из хранилища с поддержкой Range.
+
+    Если сервер поддерживает расширение ASGI http.response.zerocopysend,
+    тело уходит через sendfile, иначе - чанками по CHUNK_SIZE.
+    """
+
+    def __init__(self, path: str, offset: int, count: int, status_code: int, headers: dict, media_type: str):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        super().__init__(status_code=status_code, headers={**headers, "Content-Length": str(count)},
+                         media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def blob_response(
+    request: Request,
+    sha256: str,
+    size: int,
+    filename: Optional[str],
+    content_type: Optional[str]
+) -> Response:
+    """Ответ на скачивание: ETag = sha256 содержимого, 304, Range/If-Range"""
+    path = blob_path(sha256)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    headers = {"Accept-Ranges": "bytes", "Content-Disposition": _content_disposition(filename)}
+    media_type = content_type or "application/octet-stream"
+    etag = f'"{sha256}"'
+
+    offset, count, status_code = 0, size, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size and (if_range is None or if_range.strip() == etag):
+        requested = _parse_range(range_header, size)
+        if requested:
+            offset, count = requested
+            status_code = 206
+            headers["Content-Range"] = f"bytes {offset}-{offset + count - 1}/{size}"
+
+    response = BlobResponse(path, offset, count, status_code, headers, media_type)
+    # содержимое по sha256 не меняется - клиенту достаточно If-None-Match
+    not_modified = conditional_response(request, response, etag)
+    return not_modified or response
+
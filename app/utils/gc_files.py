@@ -0,0 +1,39 @@
+"""
+Сборка мусора в хранилище файлов: удалить blob'ы, на которые не ссылается
+ни одна строка course_files (курс удалён, загрузка не прошла квоту), и
+брошенные временные файлы прерванных загрузок.
+
+    python -m app.utils.gc_files --min-age 3600
+
+Файлы моложе --min-age секунд не трогаются: их могут сейчас загружать.
+"""
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.course_file import CourseFile
+from app.utils.file_store import collect_garbage
+
+
+def main(min_age: int) -> int:
+    db = SessionLocal()
+    try:
+        referenced = set(db.scalars(select(CourseFile.sha256).distinct()))
+    finally:
+        db.close()
+
+    removed = collect_garbage(referenced, min_age)
+    print(f"[+] removed {removed} file(s), {len(referenced)} blob(s) referenced")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-age", type=int, default=3600)
+    args = parser.parse_args()
+
+    sys.exit(main(args.min_age))
@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select, update, values, column, literal, literal_column, Integer, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
+
+from app.models.submission import Submission, SubmissionStatus
+from app.models.grade import Grade
+from app.utils.course_counters import bump_course_counters
+from app.utils.dashboard_cache import invalidate_dashboard
+
+# Оценки пишутся одним statement: CTE target читает работы задания и их
+# прежние оценки (снимок до изменений), INSERT ... ON CONFLICT (submission_id)
+# пишет оценки, UPDATE ... FROM target переводит работы в reviewed, RETURNING
+# отдаёт итоговые строки. Вызывающий коммитит.
+#
+# Снимок target читается без блокировок, поэтому перед upsert строки работ
+# блокируются (FOR UPDATE, по порядку id): параллельный upsert тех же работ
+# ждёт commit первого, и его target (новый снимок в READ COMMITTED) уже
+# видит чужую оценку. Новая ли оценка - по xmax = 0 самой upsert-строки.
+
+
+class GradeInput(NamedTuple):
+    submission_id: UUID
+    score: int
+    comment: Optional[str]
+
+
+def _upsert_statement(assignment_id: UUID, teacher_id: UUID, rows: Iterable[GradeInput], now: datetime):
+    data = values(
+        column("submission_id", PG_UUID(as_uuid=True)),
+        column("new_grade_id", PG_UUID(as_uuid=True)),
+        column("score", Integer),
+        column("comment", Text),
+        name="input"
+    ).data([(row.submission_id, uuid.uuid4(), row.score, row.comment) for row in rows])
+
+    target = (
+        select(
+            Submission.id, Submission.student_id, Submission.status,
+            Grade.id.label("old_grade_id"), Grade.score.label("old_score"),
+            data.c.new_grade_id, data.c.score, data.c.comment
+        )
+        .select_from(Submission)
+        .join(data, data.c.submission_id == Submission.id)
+        .outerjoin(Grade, Grade.submission_id == Submission.id)
+        .where(Submission.assignment_id == assignment_id)
+        .cte("target")
+    )
+
+    insert_stmt = pg_insert(Grade).from_select(
+        ["id", "submission_id", "teacher_id", "score", "comment", "graded_at", "updated_at"],
+        select(
+            target.c.new_grade_id,
+            target.c.id,
+            literal(teacher_id, Grade.teacher_id.type),
+            target.c.score,
+            target.c.comment,
+            literal(now, Grade.graded_at.type),
+            literal(now, Grade.updated_at.type)
+        )
+    )
+    upserted = insert_stmt.on_conflict_do_update(
+        index_elements=[Grade.submission_id],
+        set_={
+            "score": insert_stmt.excluded.score,
+            "comment": insert_stmt.excluded.comment,
+            "updated_at": insert_stmt.excluded.updated_at,
+        }
+    ).returning(*Grade.__table__.c, literal_column("xmax = 0").label("inserted")).cte("upserted")
+
+    reviewed = (
+        update(Submission)
+        .where(Submission.id == target.c.id, Submission.status != SubmissionStatus.reviewed)
+        .values(status=SubmissionStatus.reviewed, updated_at=now)
+        .returning(Submission.id)
+        .cte("reviewed")
+    )
+
+    return (
+        select(
+            upserted,
+            target.c.student_id,
+            target.c.status.label("previous_status"),
+            target.c.old_grade_id,
+            target.c.old_score
+        )
+        .join(target, target.c.id == upserted.c.submission_id)
+        .add_cte(reviewed)
+    )
+
+
+async def upsert_grades(
+    db,
+    course_id: UUID,
+    assignment_id: UUID,
+    teacher_id: UUID,
+    rows: Iterable[GradeInput]
+) -> Dict[UUID, object]:
+    """Выставить оценки работам задания одним запросом и поправить счётчики курса.
+
+    Возвращает строки RETURNING (колонки grades + inserted, student_id,
+    previous_status, old_grade_id, old_score) по submission_id; работ не из
+    этого задания в ответе нет. submission_id в rows не должны повторяться.
+    """
+    rows = list(rows)
+    if not rows:
+        return {}
+
+    await db.execute(
+        select(Submission.id)
+        .where(Submission.assignment_id == assignment_id, Submission.id.in_([row.submission_id for row in rows]))
+        .order_by(Submission.id)
+        .with_for_update()
+    )
+    result = {
+        row.submission_id: row
+        for row in (await db.execute(_upsert_statement(assignment_id, teacher_id, rows, datetime.utcnow()))).all()
+    }
+
+    await bump_course_counters(
+        db, course_id,
+        grades_changed=bool(result),
+        pending=-sum(row.previous_status == SubmissionStatus.pending for row in result.values()),
+        graded=sum(row.inserted for row in result.values()),
+        score_sum=sum(row.score - (0 if row.inserted else row.old_score or 0) for row in result.values())
+    )
+    return result
+
+
+def invalidate_graded(result: Dict[UUID, object]) -> None:
+    """После commit: сбросить кэш дашбордов студентов, чьи работы оценены"""
+    for student_id in {row.student_id for row in result.values()}:
+        invalidate_dashboard(student_id)
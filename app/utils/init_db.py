@@ -0,0 +1,44 @@
+"""
+Явная подготовка схемы БД (вместо create_all при импорте приложения)
+
+    python -m app.utils.init_db            # alembic upgrade head
+    python -m app.utils.init_db --create-all  # create_all без миграций (локально)
+"""
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+
+
+def upgrade_head():
+    """Применить все миграции"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+
+def create_all():
+    """Создать недостающие таблицы по моделям"""
+    from app.database import Base, get_engine
+    import app.models  # noqa: F401 - регистрирует модели в Base.metadata
+
+    Base.metadata.create_all(bind=get_engine())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--create-all", action="store_true")
+    args = parser.parse_args()
+
+    if args.create_all:
+        create_all()
+        print("[+] tables created")
+    else:
+        upgrade_head()
+        print("[+] migrations applied")
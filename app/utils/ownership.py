@@ -0,0 +1,134 @@
+from typing import NamedTuple
+from uuid import UUID
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.user import User
+from app.models.course import Course
+from app.models.assignment import Assignment
+from app.models.material import Material
+from app.models.submission import Submission
+from app.models.grade import Grade
+from app.utils.dependencies import get_current_teacher
+
+# Каждая зависимость за один JOIN-запрос загружает ресурс вместе с teacher_id
+# его курса, проверяет права и отдаёт объекты обработчику (в той же сессии)
+
+
+class OwnedAssignment(NamedTuple):
+    assignment: Assignment
+    teacher_id: UUID
+
+
+class OwnedMaterial(NamedTuple):
+    material: Material
+    teacher_id: UUID
+
+
+class OwnedSubmission(NamedTuple):
+    submission: Submission
+    assignment: Assignment
+    teacher_id: UUID
+
+
+class OwnedGrade(NamedTuple):
+    grade: Grade
+    submission: Submission
+    assignment: Assignment
+    teacher_id: UUID
+
+
+def _check_owner(teacher_id: UUID, current_user: User) -> None:
+    if teacher_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+async def get_owned_course(
+    course_id: UUID,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+) -> Course:
+    """Курс текущего преподавателя"""
+    course = await db.get(Course, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    _check_owner(course.teacher_id, current_user)
+    return course
+
+
+async def get_owned_assignment(
+    assignment_id: UUID,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+) -> OwnedAssignment:
+    """Задание курса текущего преподавателя"""
+    row = (await db.execute(
+        select(Assignment, Course.teacher_id)
+        .join(Course, Course.id == Assignment.course_id)
+        .where(Assignment.id == assignment_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    _check_owner(row.teacher_id, current_user)
+    return OwnedAssignment(*row)
+
+
+async def get_owned_material(
+    material_id: UUID,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+) -> OwnedMaterial:
+    """Материал курса текущего преподавателя"""
+    row = (await db.execute(
+        select(Material, Course.teacher_id)
+        .join(Course, Course.id == Material.course_id)
+        .where(Material.id == material_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Material not found")
+
+    _check_owner(row.teacher_id, current_user)
+    return OwnedMaterial(*row)
+
+
+async def get_owned_submission(
+    submission_id: UUID,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+) -> OwnedSubmission:
+    """Сданная работа по заданию курса текущего преподавателя"""
+    row = (await db.execute(
+        select(Submission, Assignment, Course.teacher_id)
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(Course, Course.id == Assignment.course_id)
+        .where(Submission.id == submission_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    _check_owner(row.teacher_id, current_user)
+    return OwnedSubmission(*row)
+
+
+async def get_owned_grade(
+    grade_id: UUID,
+    current_user: User = Depends(get_current_teacher),
+    db: AsyncSession = Depends(get_async_db)
+) -> OwnedGrade:
+    """Оценка за работу по курсу текущего преподавателя"""
+    row = (await db.execute(
+        select(Grade, Submission, Assignment, Course.teacher_id)
+        .join(Submission, Submission.id == Grade.submission_id)
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .join(Course, Course.id == Assignment.course_id)
+        .where(Grade.id == grade_id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Grade not found")
+
+    _check_owner(row.teacher_id, current_user)
+    return OwnedGrade(*row)
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+from uuid import UUID
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Keyset-пагинация: курсор - значения ключа сортировки последней строки страницы,
+# следующая страница начинается с WHERE (ключ) > (курсор) и идёт по индексу,
+# без OFFSET. Ключ обязан быть уникальным, поэтому последней колонкой всегда id.
+
+
+def _dump(value):
+    if isinstance(value, UUID):
+        return ["u", value.hex]
+    if isinstance(value, datetime):
+        return ["d", value.isoformat()]
+    return ["v", value]
+
+
+def _load(item):
+    kind, value = item
+    if kind == "u":
+        return UUID(value)
+    if kind == "d":
+        return datetime.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_dump(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = tuple(_load(item) for item in json.loads(raw))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class PageParams:
+    """Параметры страницы: ?cursor=...&limit=..."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Значение заголовка {NEXT_CURSOR_HEADER} предыдущей страницы"),
+        limit: int = Query(settings.PAGE_DEFAULT_LIMIT, ge=1, le=settings.PAGE_MAX_LIMIT)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def keyset(stmt, page: PageParams, *columns, descending: bool = False):
+    """Добавить к запросу условие по курсору, сортировку по ключу и LIMIT"""
+    if page.cursor:
+        key = tuple_(*columns)
+        values = decode_cursor(page.cursor, len(columns))
+        stmt = stmt.where(key < values if descending else key > values)
+
+    order = [column.desc() for column in columns] if descending else columns
+    # лишняя строка показывает, что есть следующая страница
+    return stmt.order_by(*order).limit(page.limit + 1)
+
+
+def page_rows(rows, page: PageParams, response: Response, key: Callable) -> list:
+    """Отрезать лишнюю строку и выставить курсор следующей страницы в заголовок"""
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
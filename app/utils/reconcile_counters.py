@@ -0,0 +1,35 @@
+"""
+Сверка course_counters с исходными таблицами: пересчитать и исправить дрейф.
+
+    python -m app.utils.reconcile_counters
+
+Запускать периодически (cron) и после массовых правок данных в обход API.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.database import SessionLocal
+from app.utils.course_counters import reconcile_counters
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        repaired = reconcile_counters(db)
+        db.commit()
+    finally:
+        db.close()
+
+    if repaired:
+        print(f"[!] repaired counters for {len(repaired)} course(s)")
+        for course_id in repaired:
+            print(f"    {course_id}")
+    else:
+        print("[+] counters are in sync")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
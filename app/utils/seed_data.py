@@ -11,6 +11,7 @@ from app.models.user import User, UserRole
 from app.models.course import Course, course_students
 from app.models.assignment import Assignment
 from app.utils.auth import get_password_hash
+from app.utils.course_counters import reconcile_counters
 from datetime import datetime, timedelta
 import random
 
@@ -108,6 +109,10 @@ def seed_data():
                 db.add(assignment)
 
         db.commit()
+
+        # данные созданы в обход API - заполняем course_counters пересчётом
+        reconcile_counters(db, [course.id for course in courses])
+        db.commit()
         print(f"Преподаватель: teacher@test.com / teacher123")
         print(f"Студенты: student1@test.com - student5@test.com / student123")
 
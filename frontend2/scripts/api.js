@@ -15,13 +15,37 @@ class API {
 
     removeToken() {
         localStorage.removeItem('access_token');
+        localStorage.removeItem('refresh_token');
+    }
+
+    // Access-токен короткоживущий - обновляем его по refresh-токену
+    async refreshToken() {
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (!refreshToken) {
+            return false;
+        }
+
+        const response = await fetch(`${this.baseUrl}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        });
+
+        if (!response.ok) {
+            return false;
+        }
+
+        const data = await response.json();
+        this.setToken(data.access_token);
+        localStorage.setItem('refresh_token', data.refresh_token);
+        return true;
     }
 
     isAuthenticated() {
         return !!this.getToken();
     }
 
-    async request(endpoint, options = {}) {
+    async request(endpoint, options = {}, retried = false) {
         const url = `${this.baseUrl}${endpoint}`;
         const headers = {
             'Content-Type': 'application/json',
@@ -42,13 +66,21 @@ class API {
         try {
             const response = await fetch(url, config);
 
-            // Если 401 - токен невалиден, разлогиниваем
+            // Если 401 - пробуем обновить токен, иначе разлогиниваем
+            if (response.status === 401 && !retried && await this.refreshToken()) {
+                return this.request(endpoint, options, true);
+            }
+
             if (response.status === 401) {
                 this.removeToken();
                 window.location.href = 'form.html';
                 return null;
             }
 
+            if (options.onHeaders) {
+                options.onHeaders(response.headers);
+            }
+
             const data = await response.json();
 
             if (!response.ok) {
@@ -68,6 +100,29 @@ class API {
         });
     }
 
+    // Списки отдаются страницами: следующая - по курсору из X-Next-Cursor
+    async getAll(endpoint) {
+        const items = [];
+        let cursor = null;
+
+        do {
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const url = cursor ? `${endpoint}${separator}cursor=${encodeURIComponent(cursor)}` : endpoint;
+            cursor = null;
+
+            const page = await this.request(url, {
+                method: 'GET',
+                onHeaders: headers => { cursor = headers.get('X-Next-Cursor'); }
+            });
+            if (!page) {
+                return page;
+            }
+            items.push(...page);
+        } while (cursor);
+
+        return items;
+    }
+
     async post(endpoint, data) {
         return this.request(endpoint, {
             method: 'POST',
@@ -94,6 +149,7 @@ class API {
         const data = await this.post('/auth/login', { email, password });
         if (data && data.access_token) {
             this.setToken(data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
         }
         return data;
     }
@@ -108,8 +164,8 @@ class API {
 
     // === COURSES ENDPOINTS ===
 
-    async getCourses() {
-        return this.get('/courses/');
+    async getCourses(includeCounts = false) {
+        return this.getAll(includeCounts ? '/courses/?include_counts=true' : '/courses/');
     }
 
     async getCourse(courseId) {
@@ -131,7 +187,7 @@ class API {
     // === STUDENTS ENDPOINTS ===
 
     async getCourseStudents(courseId) {
-        return this.get(`/courses/${courseId}/students`);
+        return this.getAll(`/courses/${courseId}/students`);
     }
 
     async addStudentByEmail(courseId, email) {
@@ -143,13 +199,13 @@ class API {
     }
 
     async getAllStudents() {
-        return this.get('/courses/all-students');
+        return this.getAll('/courses/all-students');
     }
 
     // === ASSIGNMENTS ENDPOINTS ===
 
     async getAssignments(courseId) {
-        return this.get(`/assignments/courses/${courseId}/assignments`);
+        return this.getAll(`/assignments/courses/${courseId}/assignments`);
     }
 
     async createAssignment(courseId, data) {
@@ -165,7 +221,23 @@ class API {
     }
 
     async getSubmissions(assignmentId) {
-        return this.get(`/assignments/${assignmentId}/submissions`);
+        return this.getAll(`/assignments/${assignmentId}/submissions`);
+    }
+
+    async getSubmission(submissionId) {
+        return this.get(`/submissions/${submissionId}`);
+    }
+
+    // Файлы хранилища требуют Bearer-токен, который обычная ссылка не передаёт:
+    // получаем короткоживущую подписанную ссылку
+    async getFileLink(fileUrl) {
+        const url = new URL(fileUrl, this.baseUrl);
+        const api = new URL(this.baseUrl);
+        if (url.origin !== api.origin || !url.pathname.startsWith(`${api.pathname}/files/courses/`)) {
+            return url.href;  // внешняя ссылка
+        }
+        const link = await this.post(`${url.pathname.slice(api.pathname.length)}/link`, {});
+        return new URL(link.url, this.baseUrl).href;
     }
 
     // === GRADING ENDPOINTS ===
@@ -181,7 +253,7 @@ class API {
     // === MATERIALS ENDPOINTS ===
 
     async getMaterials(courseId) {
-        return this.get(`/materials/courses/${courseId}/materials`);
+        return this.getAll(`/materials/courses/${courseId}/materials`);
     }
 
     async createMaterial(courseId, data) {
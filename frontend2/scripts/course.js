@@ -56,7 +56,7 @@ function renderMaterials(materials) {
         <div class="material-item">
             <h3>${m.title}</h3>
             <p>${m.content || 'Нет описания'}</p>
-            ${m.file_url ? `<p><a href="${m.file_url}" target="_blank">Открыть файл</a></p>` : ''}
+            ${m.file_url ? `<p><a href="${m.file_url}" target="_blank" onclick="return openFile(this.href)">Открыть файл</a></p>` : ''}
             <div class="item-actions">
                 <button onclick="editMaterial('${m.id}')">Редактировать</button>
                 <button class="danger" onclick="deleteMaterial('${m.id}')">Удалить</button>
@@ -255,10 +255,10 @@ function renderSubmissions(submissions, assignmentId) {
                 <p><strong>Статус:</strong> ${s.status}</p>
                 <p><strong>Дата сдачи:</strong> ${new Date(s.submitted_at).toLocaleString('ru-RU')}</p>
 
-                <div class="submission-content">
+                <div class="submission-content" id="content_${s.id}">
                     <strong>Ответ студента:</strong><br>
-                    ${s.content || 'Нет текстового ответа'}
-                    ${s.file_url ? `<br><br><a href="${s.file_url}" target="_blank">Открыть прикрепленный файл</a>` : ''}
+                    ${s.content_preview || 'Нет текстового ответа'}${isTruncated(s) ? '…' : ''}
+                    ${isTruncated(s) || s.has_file ? `<br><br><button onclick="loadSubmissionContent('${s.id}')">Открыть работу целиком</button>` : ''}
                 </div>
 
                 ${hasGrade ? `
@@ -280,6 +280,33 @@ function renderSubmissions(submissions, assignmentId) {
     }).join('');
 }
 
+// в списке приходит только превью ответа, полный текст и файл - по запросу
+function isTruncated(s) {
+    return s.content_preview !== null && s.content_preview !== undefined
+        && new TextEncoder().encode(s.content_preview).length < s.content_length;
+}
+
+// файл отдаётся с Content-Disposition: attachment - переход по ссылке только скачивает его
+function openFile(url) {
+    api.getFileLink(url)
+        .then(link => window.location.assign(link))
+        .catch(error => alert('Ошибка открытия файла: ' + error.message));
+    return false;
+}
+
+async function loadSubmissionContent(submissionId) {
+    try {
+        const s = await api.getSubmission(submissionId);
+        document.getElementById(`content_${submissionId}`).innerHTML = `
+            <strong>Ответ студента:</strong><br>
+            ${s.content || 'Нет текстового ответа'}
+            ${s.file_url ? `<br><br><a href="${s.file_url}" target="_blank" onclick="return openFile(this.href)">Открыть прикрепленный файл</a>` : ''}
+        `;
+    } catch (error) {
+        alert('Ошибка загрузки работы: ' + error.message);
+    }
+}
+
 async function gradeSubmission(submissionId, assignmentId) {
     const score = parseInt(document.getElementById(`score_${submissionId}`).value);
     const comment = document.getElementById(`comment_${submissionId}`).value;
@@ -388,6 +415,10 @@ function renderStats(stats, progress) {
                 <h3>Сдано работ</h3>
                 <div class="stat-value">${stats.total_submissions}</div>
             </div>
+            <div class="stat-card">
+                <h3>Проверено</h3>
+                <div class="stat-value">${Math.round(stats.graded_ratio * 100)}%</div>
+            </div>
             <div class="stat-card">
                 <h3>Средний балл</h3>
                 <div class="stat-value">${stats.average_score}</div>
@@ -21,7 +21,7 @@ async function init() {
 // Загрузка курсов
 async function loadCourses() {
     try {
-        const courses = await api.getCourses();
+        const courses = await api.getCourses(true);
         renderCourses(courses);
     } catch (error) {
         console.error('Ошибка загрузки курсов:', error);
@@ -52,6 +52,7 @@ function renderCourses(courses) {
                 <div class="item-describtion">
                     <h1>${course.title}</h1>
                     <span>${course.description || 'Описание отсутствует'}</span>
+                    <span>Студентов: ${course.students_count} · Заданий: ${course.assignments_count} · На проверке: ${course.pending_submissions}</span>
                 </div>
                 <div class="item-nav">
                     <button onclick="openCourse('${course.id}')">
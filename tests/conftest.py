@@ -0,0 +1,42 @@
+"""
+Общие фикстуры тестов. Тесты идут на настоящий PostgreSQL (DATABASE_URL) с
+применёнными миграциями (alembic upgrade head); если база недоступна, они
+пропускаются.
+
+    pip install -r requirements-dev.txt
+    pytest
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from app.config import settings
+from app.database import get_engine, get_async_engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Доступность PostgreSQL; без него тест пропускается"""
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except (OperationalError, OSError) as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+
+
+@pytest.fixture
+def statements(database):
+    """SQL, выполненный приложением за время теста (слушатель before_cursor_execute)"""
+    engine = get_async_engine().sync_engine if settings.DB_ASYNC else get_engine()
+    executed = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", _record)
@@ -0,0 +1,142 @@
+"""
+Горячие запросы роутеров идут по своим индексам: EXPLAIN каждого запроса
+должен содержать ожидаемый индекс и не содержать Seq Scan по целевой таблице.
+
+Seq Scan отключается (enable_seqscan = off) - тогда план не зависит от объёма
+данных в тестовой базе, а Seq Scan остаётся, только если подходящего индекса нет.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+# (название, целевая таблица, SQL, допустимые индексы)
+HOT_QUERIES = [
+    (
+        "enrollment check",
+        "course_students",
+        "SELECT 1 FROM course_students WHERE course_id = :course_id AND student_id = :student_id",
+        {"pk_course_students"},
+    ),
+    (
+        "student courses",
+        "course_students",
+        "SELECT course_id FROM course_students WHERE student_id = :student_id",
+        {"ix_course_students_student_id"},
+    ),
+    (
+        "course students",
+        "course_students",
+        "SELECT student_id FROM course_students WHERE course_id = :course_id",
+        {"pk_course_students"},
+    ),
+    (
+        "own submission",
+        "submissions",
+        "SELECT * FROM submissions WHERE assignment_id = :assignment_id AND student_id = :student_id",
+        {"uq_submissions_assignment_student"},
+    ),
+    (
+        "assignment submissions",
+        "submissions",
+        "SELECT * FROM submissions WHERE assignment_id = :assignment_id",
+        {
+            "uq_submissions_assignment_student",
+            "ix_submissions_assignment_submitted",
+            "ix_submissions_assignment_status",
+        },
+    ),
+    (
+        "assignment submissions page",
+        "submissions",
+        "SELECT id FROM submissions WHERE assignment_id = :assignment_id "
+        "ORDER BY submitted_at, id LIMIT 101",
+        {"ix_submissions_assignment_submitted"},
+    ),
+    (
+        "assignment submissions by status",
+        "submissions",
+        "SELECT id FROM submissions WHERE assignment_id = :assignment_id AND status = :status "
+        "ORDER BY submitted_at, id LIMIT 101",
+        {"ix_submissions_assignment_status"},
+    ),
+    (
+        "course assignments",
+        "assignments",
+        "SELECT * FROM assignments WHERE course_id = :course_id",
+        {"ix_assignments_course_id"},
+    ),
+    (
+        "course materials",
+        "materials",
+        "SELECT * FROM materials WHERE course_id = :course_id ORDER BY order_number",
+        {"ix_materials_course_order"},
+    ),
+    (
+        "teacher courses",
+        "courses",
+        "SELECT * FROM courses WHERE teacher_id = :teacher_id",
+        {"ix_courses_teacher_id"},
+    ),
+    (
+        "users page",
+        "users",
+        "SELECT * FROM users WHERE (created_at, id) > (:created_at, :id) ORDER BY created_at, id LIMIT 101",
+        {"ix_users_created_at_id"},
+    ),
+    (
+        "grade by submission",
+        "grades",
+        "SELECT * FROM grades WHERE submission_id = :submission_id",
+        {"grades_submission_id_key"},
+    ),
+]
+
+PARAMS = {
+    "course_id": str(uuid.uuid4()),
+    "student_id": str(uuid.uuid4()),
+    "assignment_id": str(uuid.uuid4()),
+    "teacher_id": str(uuid.uuid4()),
+    "submission_id": str(uuid.uuid4()),
+    "id": str(uuid.uuid4()),
+    "status": "pending",
+    "created_at": datetime(2026, 1, 1),
+}
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+def explain(database):
+    db = SessionLocal()
+    try:
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+
+        def _explain(query: str) -> list:
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), PARAMS).scalar()[0]["Plan"]
+            return list(_plan_nodes(plan))
+
+        yield _explain
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "table, query, indexes",
+    [pytest.param(table, query, indexes, id=name) for name, table, query, indexes in HOT_QUERIES]
+)
+def test_hot_query_uses_index(explain, table, query, indexes):
+    nodes = explain(query)
+
+    seq_scans = [node for node in nodes if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == table]
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert not seq_scans, f"Seq Scan on {table}"
+    assert used & indexes, f"expected one of {sorted(indexes)}, planner used {sorted(used) or 'no index'}"
@@ -0,0 +1,137 @@
+"""
+Проверка прав на ресурс - один запрос к БД: каждый роут, который зависит от
+get_owned_* (app/utils/ownership.py), вызывается через TestClient, а запросы
+самой проверки считаются слушателем before_cursor_execute.
+"""
+import functools
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.main import app
+from app.utils import ownership
+from app.utils.bench_grading import seed_teachers, seed
+
+# зависимость -> параметр пути с id ресурса
+OWNERSHIP_DEPENDENCIES = {
+    ownership.get_owned_course: "course_id",
+    ownership.get_owned_assignment: "assignment_id",
+    ownership.get_owned_material: "material_id",
+    ownership.get_owned_submission: "submission_id",
+    ownership.get_owned_grade: "grade_id",
+}
+
+# сразу после проверки прав запрос обрывается этим статусом, чтобы обработчик
+# (запись, удаление) не трогал данные следующих проверок
+STOP_STATUS = 418
+
+FIXTURE_SQL = [
+    """
+    INSERT INTO grades (id, submission_id, teacher_id, score, comment, graded_at, updated_at)
+    VALUES (gen_random_uuid(), :submission_id, :teacher_id, 50, NULL, now(), now())
+    ON CONFLICT (submission_id) DO NOTHING
+    """,
+    """
+    INSERT INTO materials (id, course_id, title, order_number, created_at, updated_at)
+    VALUES (gen_random_uuid(), :course_id, 'Ownership check', 1, now(), now())
+    """,
+]
+
+
+def _ownership_dependency(dependant):
+    """get_owned_* среди зависимостей роута (с учётом вложенных)"""
+    for dependency in dependant.dependencies:
+        if dependency.call in OWNERSHIP_DEPENDENCIES:
+            return dependency.call
+        found = _ownership_dependency(dependency)
+        if found is not None:
+            return found
+    return None
+
+
+def _ownership_routes() -> list:
+    routes = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        dependency = _ownership_dependency(route.dependant)
+        if dependency is not None:
+            method = sorted(route.methods - {"HEAD"} or route.methods)[0]
+            routes.append(pytest.param(route, method, id=f"{method} {route.path}"))
+    return routes
+
+
+@pytest.fixture(scope="module")
+def owned(database):
+    """Курс преподавателя с заданием, работой, оценкой и материалом; (заголовки, id)"""
+    [teacher_id] = seed_teachers(1, 1)
+    headers, [(assignment_id, [submission_id])] = seed(teacher_id, 1, 1)
+    db = SessionLocal()
+    try:
+        course_id = db.execute(
+            text("SELECT course_id FROM assignments WHERE id = :id"), {"id": assignment_id}
+        ).scalar()
+        params = {"teacher_id": teacher_id, "course_id": course_id, "submission_id": submission_id}
+        for statement in FIXTURE_SQL:
+            db.execute(text(statement), params)
+        db.commit()
+
+        ids = {
+            "course_id": course_id,
+            "assignment_id": assignment_id,
+            "submission_id": submission_id,
+            "grade_id": db.execute(
+                text("SELECT id FROM grades WHERE submission_id = :id"), {"id": submission_id}
+            ).scalar(),
+            "material_id": db.execute(
+                text("SELECT id FROM materials WHERE course_id = :id"), {"id": course_id}
+            ).scalar(),
+        }
+    finally:
+        db.close()
+    return headers, ids
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def ownership_queries(statements):
+    """Число запросов каждой вызванной проверки прав"""
+    counts = []
+
+    def counting(dependency):
+        @functools.wraps(dependency)
+        async def wrapper(*args, **kwargs):
+            started = len(statements)
+            await dependency(*args, **kwargs)
+            counts.append(len(statements) - started)
+            raise HTTPException(status_code=STOP_STATUS)
+        return wrapper
+
+    app.dependency_overrides.update({dependency: counting(dependency) for dependency in OWNERSHIP_DEPENDENCIES})
+    yield counts
+    for dependency in OWNERSHIP_DEPENDENCIES:
+        app.dependency_overrides.pop(dependency, None)
+
+
+@pytest.mark.parametrize("route, method", _ownership_routes())
+def test_ownership_check_is_one_query(route, method, owned, client, ownership_queries):
+    headers, ids = owned
+    # остальные параметры пути (sha256 файла и т.п.) проверке прав не нужны
+    path = route.path_format.format(**{
+        name: ids.get(name, uuid.uuid4()) for name in route.param_convertors
+    })
+
+    response = client.request(method, path, headers=headers)
+
+    assert response.status_code == STOP_STATUS, response.text
+    assert ownership_queries == [1]